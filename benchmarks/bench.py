@@ -0,0 +1,184 @@
+"""Micro and end-to-end benchmarks for the localizer.
+
+    python benchmarks/bench.py --save results.json
+    python benchmarks/bench.py --compare results.json --threshold 0.2
+
+Each benchmark is timed with timeit (auto-ranged loop count, best of --repeat runs) and
+reported per call. --save writes the numbers as JSON; --compare reads a saved run and
+exits non-zero if any benchmark got slower by more than --threshold (a fraction).
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from localizer import SYMPTOMS, Localizer, load_knowledge  # noqa: E402
+from localizer.vessels import VESSEL_PATTERNS  # noqa: E402
+
+WALLENBERG = [
+    "Vertigo", "Dysarthria", "Facial palsy (Upper & Lower face equally affected)",
+    "Sensory loss (Dissociated - e.g. pain/temp affected, light touch spared)",
+]
+LACUNAR = [
+    "Right hemiparesis (Upper & Lower equally)", "Facial palsy (Lower face only affected)",
+    "Sensory loss (Hemibody, all modalities)",
+]
+SYMPTOM_SETS = {
+    "empty": [],
+    "single": ["Vertigo"],
+    "wallenberg": WALLENBERG,
+    "lacunar": LACUNAR,
+    "all": list(SYMPTOMS),
+}
+LESIONS = ("Right Thalamus", "Thalamus", "Left Medulla", "Spinal Cord (Cervical)", "Cerebellum (Vermis)",
+           "Contralateral Internal Capsule")
+VESSEL_NAMES = [vessel for vessel, _ in VESSEL_PATTERNS]
+
+
+def _for_each(function, values):
+    def run():
+        for value in values:
+            function(value)
+    return run, len(values)
+
+
+def micro_benchmarks():
+    """(name, callable, calls per invocation) for the engine-level benchmarks."""
+    localizer = Localizer()
+    catalog = localizer.catalog
+    # The matchers the Localizer standardizes rule names with when it is built
+    yield ("standardize_location", *_for_each(localizer.anatomy.standardize_relative, LESIONS))
+    yield ("standardize_vessel", *_for_each(localizer.vessels.standardize, VESSEL_NAMES + ["pontine arteries", "mca branches"]))
+    # Building the catalog: interning every name and precomputing the supersession masks
+    yield ("localizer[build]", lambda: Localizer(localizer.knowledge), 1)
+
+    # Supersession and the Territory filter on the catalog masks, sparse to everything set
+    locations = {"one": 1, "all": (1 << len(catalog.locations)) - 1}
+    vessels = {"one": 1, "all": (1 << len(catalog.vessels)) - 1}
+    analyses = (1 << len(catalog.analyses)) - 1
+    for size in ("one", "all"):
+        yield (f"lateralize[{size}]", lambda mask=locations[size]: catalog.lateralize(mask, "Right"), 1)
+        yield (f"supersede_locations[{size}]", lambda mask=locations[size]: catalog.supersede_locations(mask), 1)
+        yield (f"supersede_vessels[{size}]", lambda mask=vessels[size]: catalog.supersede_vessels(mask), 1)
+        yield (f"additional[{size}]", lambda mask=vessels[size]: catalog.additional(mask, analyses), 1)
+
+    for name, symptoms in SYMPTOM_SETS.items():
+        yield (f"localize[{name}]", lambda symptoms=symptoms: localizer.localize(symptoms, "sudden weakness"), 1)
+
+    from localizer.ranking import Ranker
+
+    ranker = Ranker(localizer)
+    for name, symptoms in SYMPTOM_SETS.items():
+        result = localizer.localize(symptoms)
+        yield (f"rank[{name}]", lambda result=result, symptoms=symptoms: ranker.rank(result, symptoms), 1)
+
+
+def apptest_benchmarks():
+    """Full script reruns through Streamlit's headless AppTest."""
+    from streamlit.testing.v1 import AppTest
+
+    script = str(ROOT / "One.py")
+    at = AppTest.from_file(script, default_timeout=60).run()
+    selections = [WALLENBERG, LACUNAR, ["Vertigo"], []]
+    state = {"i": 0}
+
+    def rerun_with_new_selection():
+        state["i"] += 1
+        at.multiselect(key="symptoms").set_value(selections[state["i"] % len(selections)]).run()
+
+    yield ("apptest[first_run]", lambda: AppTest.from_file(script, default_timeout=60).run(), 1)
+    yield ("apptest[rerun]", lambda: at.run(), 1)
+    yield ("apptest[symptom_change]", rerun_with_new_selection, 1)
+
+
+def measure(function, calls, repeat, min_time):
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    times = [t / (loops * calls) for t in timer.repeat(repeat=repeat, number=loops)]
+    return {"seconds": min(times), "mean": sum(times) / len(times), "loops": loops, "calls": calls}
+
+
+def run(args):
+    benchmarks = list(micro_benchmarks())
+    if not args.skip_apptest:
+        try:
+            benchmarks += list(apptest_benchmarks())
+        except ImportError:
+            print("streamlit is not installed; skipping AppTest benchmarks", file=sys.stderr)
+    results = {}
+    for name, function, calls in benchmarks:
+        if args.filter and args.filter not in name:
+            continue
+        heavy = name.startswith("apptest")
+        results[name] = measure(function, calls, repeat=3 if heavy else args.repeat,
+                                min_time=0.0 if heavy else args.min_time)
+        print(f"{name:<40} {_format(results[name]['seconds'])}")
+    return results
+
+
+def _format(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a saved run; returns the names that regressed."""
+    regressed = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        change = result["seconds"] / before["seconds"] - 1
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {_format(before['seconds'])} -> {_format(result['seconds'])} ({change:+.1%}){flag}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a JSON file written by --save")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing (default 0.2 = 20%%)")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per benchmark; the best is kept (default 5)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing run (default 0.2)")
+    parser.add_argument("--skip-apptest", action="store_true", help="Skip the Streamlit AppTest reruns")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    if args.save:
+        payload = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "knowledge_version": load_knowledge().version,
+            },
+            "results": results,
+        }
+        Path(args.save).write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print()
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} benchmark(s) slower than the {args.threshold:.0%} threshold: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Load generator for the JSON HTTP API (`python -m localizer serve`).
+
+    python benchmarks/http_load.py --connections 16 --requests 5000 --pipeline 4
+
+Opens N keep-alive connections, each sending a mix of single localization, batch
+localization and NIHSS requests (optionally pipelined), and reports throughput and
+p50/p99 latency per endpoint. Uses only the standard library.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from localizer import SYMPTOMS, load_knowledge  # noqa: E402
+
+COMPLAINTS = ("", "sudden weakness", "woke up with facial droop and slurred speech", "dizzy")
+
+
+def _case(rng):
+    return {"symptoms": rng.sample(SYMPTOMS, rng.randint(0, 5)), "chief_complaint": rng.choice(COMPLAINTS)}
+
+
+def make_request(rng, nihss_items, batch_size):
+    """One (endpoint, body) pair from the request mix."""
+    kind = rng.random()
+    if kind < 0.6:
+        return "/localize", _case(rng)
+    if kind < 0.8:
+        return "/localize/batch", {"cases": [_case(rng) for _ in range(batch_size)]}
+    scores = {item: rng.choice(scores) for item, scores in nihss_items if rng.random() < 0.9}
+    return "/nihss", {"scores": scores}
+
+
+def _encode(host, path, body):
+    data = json.dumps(body).encode("utf-8")
+    head = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n")
+    return head.encode("latin-1") + data
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def connection(host, port, requests, pipeline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for start in range(0, len(requests), pipeline):
+            window = requests[start:start + pipeline]
+            sent = time.perf_counter()
+            writer.write(b"".join(_encode(host, path, body) for path, body in window))
+            await writer.drain()
+            for path, _ in window:
+                status = await _read_response(reader)
+                latencies[path].append(time.perf_counter() - sent)
+                if status != 200:
+                    errors[status] += 1
+    finally:
+        writer.close()
+
+
+def _percentile(values, q):
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    nihss_items = load_knowledge().nihss_items
+    requests = [make_request(rng, nihss_items, args.batch_size) for _ in range(args.requests)]
+    per_connection = [requests[i::args.connections] for i in range(args.connections)]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    start = time.perf_counter()
+    await asyncio.gather(*(connection(args.host, args.port, reqs, args.pipeline, latencies, errors)
+                           for reqs in per_connection if reqs))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.requests} requests over {args.connections} connections (pipeline {args.pipeline}) "
+          f"in {elapsed:.2f}s: {args.requests / elapsed:,.0f} req/s")
+    everything = [t for values in latencies.values() for t in values]
+    for path, values in sorted(latencies.items()) + [("all", everything)]:
+        print(f"  {path:<16} n={len(values):<6} p50={_percentile(values, 50) * 1000:7.2f} ms"
+              f"  p99={_percentile(values, 99) * 1000:7.2f} ms")
+    if errors:
+        print(f"  non-200 responses: {dict(errors)}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--connections", type=int, default=8, help="Concurrent keep-alive connections (default 8)")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests (default 2000)")
+    parser.add_argument("--pipeline", type=int, default=1, help="Requests in flight per connection (default 1)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Cases per /localize/batch request (default 50)")
+    parser.add_argument("--seed", type=int, default=0)
+    return asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
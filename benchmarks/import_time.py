@@ -0,0 +1,121 @@
+"""Cold-start budget: import time of the localizer core, checked with -X importtime.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget first_localize=60 --repeat 9
+
+Each target runs in a fresh interpreter under `python -X importtime`. The import time
+is the sum of the self times of every module imported by the target (the interpreter's
+own `site` imports are left out), and the wall time covers the whole snippet, so for
+`first_localize` it includes loading the knowledge snapshot and the first call. The
+median of --repeat runs is compared with the target's budget in milliseconds, after one
+discarded run that warms the OS page cache and the knowledge snapshot.
+
+Exits non-zero if a median is over budget, or if a target imports a module it must not
+(the UI and numeric stacks are only for One.py and the vectorized paths).
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Never loaded by the core: these belong to the app entry point or to opt-in paths
+HEAVY = ("streamlit", "numpy", "pandas", "pyarrow", "asyncio", "concurrent.futures", "dataclasses")
+
+# name -> (snippet, budget in ms for the wall time, forbidden modules)
+TARGETS = {
+    "package": ("import localizer", 5.0, HEAVY),
+    "engine": ("import localizer.engine", 40.0, HEAVY),
+    "first_localize": ("from localizer import localize; localize(['Vertigo'])", 50.0, HEAVY),
+    "cli": ("import localizer.cli", 50.0, HEAVY),
+}
+
+_TIMED = "import time as _t; _start = _t.perf_counter()\n{snippet}\nprint(_t.perf_counter() - _start)"
+
+
+def parse_importtime(stderr):
+    """[(module, self us, depth)] for the imports after the interpreter's `site` block."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, _, name = line.split("|", 2)
+        self_us = int(self_part.split(":")[1])
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        name = name.strip()
+        if depth == 0 and name == "site":
+            entries = []
+            continue
+        entries.append((name, self_us, depth))
+    return entries
+
+
+def run_once(snippet):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _TIMED.format(snippet=snippet)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    wall = float(completed.stdout.strip().splitlines()[-1]) * 1000
+    return wall, parse_importtime(completed.stderr)
+
+
+def measure(snippet, repeat):
+    """(median wall ms, median import ms, modules imported, slowest modules of the last run)."""
+    run_once(snippet)
+    walls, imports = [], []
+    for _ in range(repeat):
+        wall, entries = run_once(snippet)
+        walls.append(wall)
+        imports.append(sum(self_us for _, self_us, _ in entries) / 1000)
+    modules = {name for name, _, _ in entries}
+    slowest = sorted(entries, key=lambda entry: -entry[1])
+    return statistics.median(walls), statistics.median(imports), modules, slowest
+
+
+def _budgets(overrides):
+    budgets = {name: budget for name, (_, budget, _) in TARGETS.items()}
+    for override in overrides:
+        name, _, value = override.partition("=")
+        if name not in budgets or not value:
+            raise SystemExit(f"--budget expects NAME=MS with NAME one of {', '.join(TARGETS)}: {override!r}")
+        budgets[name] = float(value)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=MS",
+                        help="Override a target's budget in milliseconds (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per target; the median is kept (default 5)")
+    parser.add_argument("--filter", help="Only run targets whose name contains this")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to list for a failing target (default 5)")
+    args = parser.parse_args(argv)
+    budgets = _budgets(args.budget)
+
+    failures = []
+    for name, (snippet, _, forbidden) in TARGETS.items():
+        if args.filter and args.filter not in name:
+            continue
+        wall, imports, modules, slowest = measure(snippet, args.repeat)
+        heavy = sorted({f for m in modules for f in forbidden if m == f or m.startswith(f + ".")})
+        over = wall > budgets[name]
+        flag = "  OVER BUDGET" if over else ""
+        print(f"{name:<16} {wall:7.1f} ms (imports {imports:6.1f} ms, {len(modules):3} modules)"
+              f"  budget {budgets[name]:.0f} ms{flag}")
+        if heavy:
+            print(f"{'':<16} imports {', '.join(heavy)}")
+        if over or heavy:
+            failures.append(name)
+            for module, self_us, _ in slowest[:args.top]:
+                print(f"{'':<16} {self_us / 1000:7.2f} ms  {module}")
+    if failures:
+        print(f"\n{len(failures)} target(s) failed the cold-start budget: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Concurrent-session load test and memory accounting for One.py.
+
+    python benchmarks/session_load.py --sessions 20 --interactions 30 --workers 2
+
+Simulates N open sessions, each a headless AppTest against the shared process, so the
+cached localizer and result cache are shared as they are on a real server. Every
+session makes random interactions: picking symptoms, typing a chief complaint, scoring
+NIHSS items and flipping the compact toggle.
+
+AppTest runs one script run per process at a time, so each worker process keeps its
+sessions open together and interleaves their reruns round-robin; --workers spreads
+sessions over processes to load several cores. Reports rerun latency percentiles,
+peak RSS, and tracemalloc memory retained per session after the first run and after
+the interactions. The gap between the two shows growth.
+"""
+
+import argparse
+import gc
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from localizer import SYMPTOMS  # noqa: E402
+
+SCRIPT = str(ROOT / "One.py")
+COMPLAINTS = ("", "sudden weakness", "slurred speech and facial droop", "dizzy since this morning", "numbness")
+
+
+def _new_session():
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(SCRIPT, default_timeout=60).run()
+
+
+def interact(at, rng):
+    """One random user interaction followed by the rerun it triggers."""
+    action = rng.random()
+    if action < 0.5:
+        at.multiselect(key="symptoms").set_value(rng.sample(SYMPTOMS, rng.randint(0, 6)))
+    elif action < 0.7:
+        at.text_input(key="chief_complaint").set_value(rng.choice(COMPLAINTS))
+    elif action < 0.95 and len(at.selectbox):
+        box = rng.choice(list(at.selectbox))
+        box.set_value(rng.choice(box.options))
+    else:
+        toggle = at.toggle(key="single_payload")
+        toggle.set_value(not toggle.value)
+    at.run()
+
+
+def _traced():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def run_sessions(n_sessions, interactions, seed, top=10):
+    """Run `n_sessions` interleaved sessions in this process; returns latencies and memory."""
+    # Warm up outside the traced region so process-wide state (modules, compiled rules,
+    # render caches) is not charged to the sessions.
+    _new_session()
+    tracemalloc.start()
+    baseline = _traced()
+    sessions = [_new_session() for _ in range(n_sessions)]
+    created = _traced()
+
+    rngs = [random.Random(seed + i) for i in range(n_sessions)]
+    latencies = []
+    errors = []
+    for _ in range(interactions):
+        for at, rng in zip(sessions, rngs):
+            start = time.perf_counter()
+            try:
+                interact(at, rng)
+            except Exception as e:  # report at the end instead of stopping every session
+                errors.append(repr(e))
+                continue
+            latencies.append(time.perf_counter() - start)
+            if at.exception:
+                errors.append(at.exception[0].value)
+    after = _traced()
+    sites = [(stat.size, str(stat.traceback[0])) for stat in tracemalloc.take_snapshot().statistics("lineno")[:top]]
+    tracemalloc.stop()
+    return {
+        "sessions": n_sessions,
+        "latencies": latencies,
+        "errors": errors,
+        "created": created - baseline,
+        "after": after - baseline,
+        "sites": sites,
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,  # KiB on Linux
+    }
+
+
+def _percentiles(values):
+    if len(values) < 2:
+        return (values or [0.0]) * 3
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[89], cuts[98]
+
+
+def run(args):
+    workers = max(1, min(args.workers, args.sessions))
+    shares = [args.sessions // workers + (i < args.sessions % workers) for i in range(workers)]
+    start = time.perf_counter()
+    if workers == 1:
+        reports = [run_sessions(args.sessions, args.interactions, args.seed, args.top)]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            reports = list(pool.map(run_sessions, shares, [args.interactions] * workers,
+                                    [args.seed + 1000 * i for i in range(workers)], [args.top] * workers))
+    elapsed = time.perf_counter() - start
+
+    latencies = [t for report in reports for t in report["latencies"]]
+    errors = [e for report in reports for e in report["errors"]]
+    p50, p90, p99 = _percentiles(latencies)
+    created = sum(report["created"] for report in reports) / args.sessions
+    after = sum(report["after"] for report in reports) / args.sessions
+    print(f"{args.sessions} sessions x {args.interactions} interactions over {workers} process(es): "
+          f"{len(latencies)} reruns, {elapsed:.1f}s wall time including session start-up")
+    print(f"rerun latency   p50={p50 * 1000:.1f} ms  p90={p90 * 1000:.1f} ms  p99={p99 * 1000:.1f} ms")
+    print(f"peak RSS        {max(report['peak_rss_kib'] for report in reports) / 1024:.1f} MiB per process")
+    print(f"per session     {created / 1024:.1f} KiB after first run, {after / 1024:.1f} KiB after interactions")
+    print("top allocation sites still held (first process):")
+    for size, site in reports[0]["sites"]:
+        print(f"  {size / 1024:8.1f} KiB  {site}")
+    if errors:
+        print(f"{len(errors)} interaction(s) failed, first error: {errors[0]}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="Open sessions (default 10)")
+    parser.add_argument("--interactions", type=int, default=20, help="Interactions per session (default 20)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes to spread the sessions over (default 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=10, help="Allocation sites to list (default 10)")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
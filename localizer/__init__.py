@@ -0,0 +1,30 @@
+"""Streamlit-free stroke localization engine behind One.py.
+
+The exports below are imported on first use, so `import localizer` (and the CLI,
+server and worker processes that start with it) only pays for the modules it touches.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "Localizer": "engine", "Result": "engine", "localize": "engine",
+    "Extraction": "extract", "SymptomExtractor": "extract", "extract_symptoms": "extract",
+    "KnowledgeBase": "knowledge", "KnowledgeBaseError": "knowledge", "load_knowledge": "knowledge",
+    "ReverseIndex": "reverse", "ReverseLookup": "reverse",
+    "NIHSS_KEYWORDS": "vocab", "SYMPTOMS": "vocab",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,101 @@
+"""Lesion location standardization.
+
+Free-text lesion descriptions are mapped onto canonical structure names with a single
+Aho-Corasick pass over the text, so the cost depends on the length of the description
+and not on how many structures are known.
+"""
+
+from typing import NamedTuple, Optional
+
+from .matching import PriorityMatcher
+
+SIDES = ("Right", "Left")
+
+# Rule locations named relative to the side of the deficit ("Contralateral Thalamus")
+CONTRALATERAL = "Contralateral"
+IPSILATERAL = "Ipsilateral"
+LATERALITIES = (CONTRALATERAL, IPSILATERAL)
+
+# The spinal cord and its parts call for spine imaging
+SPINAL_CORD = "Spinal Cord"
+
+# Structures with a generic and a Right/Left specific form: (canonical name, lower-case aliases).
+# Listed in matching priority: the first structure mentioned in this order wins.
+SIDED_STRUCTURES = (
+    ("Internal Capsule", ("internal capsule",)),
+    ("Thalamus", ("thalamus",)),
+    ("Motor Cortex", ("motor cortex", "precentral gyrus")),
+    ("Parietal Lobe", ("parietal lobe",)),
+    ("Frontal Lobe", ("frontal lobe",)),
+    ("Temporal Lobe", ("temporal lobe",)),
+    ("Occipital Lobe", ("occipital lobe",)),
+    ("Basal Ganglia", ("basal ganglia",)),
+    ("Subcortical White Matter", ("subcortical white matter",)),
+)
+
+# Brainstem parts replace the general brainstem the same way a side replaces a generic
+# structure. Checked before every sided structure.
+BRAINSTEM = (
+    "Brainstem (General)", ("brainstem",),
+    (
+        ("Lateral Medulla (Brainstem)", ("lateral medulla",)),
+        ("Pons (Brainstem)", ("pons",)),
+        ("Medulla (Brainstem)", ("medulla",)),
+        ("Midbrain (Brainstem)", ("midbrain",)),
+    ),
+)
+
+
+class Structure(NamedTuple):
+    """A family of locations: a generic name and the specific forms that supersede it."""
+    name: str
+    forms: frozenset
+
+
+class Location(NamedTuple):
+    name: str
+    structure: Optional[Structure] = None
+    specific: bool = False
+    # CONTRALATERAL/IPSILATERAL for a generic structure named relative to the deficit's side
+    laterality: Optional[str] = None
+
+
+def structure_table(sided=SIDED_STRUCTURES, brainstem=BRAINSTEM, sides=SIDES):
+    """(canonical name, structure, specific, patterns) rows in matching priority order."""
+    rows = []
+    generic, generic_patterns, parts = brainstem
+    structure = Structure(generic, frozenset(name for name, _ in parts))
+    for name, patterns in parts:
+        rows.append((name, structure, True, patterns))
+    rows.append((generic, structure, False, generic_patterns))
+    for name, aliases in sided:
+        structure = Structure(name, frozenset(f"{side} {name}" for side in sides))
+        for side in sides:
+            rows.append((f"{side} {name}", structure, True, tuple(f"{side.lower()} {alias}" for alias in aliases)))
+        rows.append((name, structure, False, aliases))
+    return rows
+
+
+class AnatomyMatcher:
+    """Standardizes lesion descriptions with one automaton over every structure pattern."""
+
+    def __init__(self, rows=None):
+        rows = structure_table() if rows is None else rows
+        self._matcher = PriorityMatcher(
+            [(Location(name, structure, specific), patterns) for name, structure, specific, patterns in rows]
+        )
+
+    def standardize(self, location_str):
+        """Canonical Location for a free-text lesion description."""
+        loc = location_str.strip()
+        # Default: keep as is if no specific standardization rule
+        return self._matcher.match(loc) or Location(loc)
+
+    def standardize_relative(self, location_str):
+        """Like `standardize`, but "Contralateral/Ipsilateral <structure>" keeps its laterality,
+        so the location can be resolved to a side once the case is known (see graph.py)."""
+        location = self.standardize(location_str)
+        laterality = location_str.strip().split(" ", 1)[0].capitalize()
+        if laterality in LATERALITIES and location.structure is not None and not location.specific:
+            return location._replace(name=f"{laterality} {location.name}", laterality=laterality)
+        return location
@@ -0,0 +1,295 @@
+"""Append-only audit log of localizations and NIHSS totals.
+
+    log = AuditLog("audit.sqlite3")
+    log.record_localization(symptoms, chief_complaint, result, session=...)
+    log.record_nihss(symptoms, chief_complaint, entered_scores, total, session=...)
+
+Recording only puts a tuple on a bounded queue; a background thread drains it and
+writes whole batches to SQLite in WAL mode, one transaction per batch, so the caller
+never waits on the disk. Results are decoded into names on the writer thread too. When
+the queue is full the caller blocks until the writer catches up (backpressure), so no
+record is dropped: a batch SQLite refuses is retried with backoff and, if it still
+cannot be written, appended to a JSON-lines file next to the database
+(`<path>.failed.jsonl`) and logged.
+
+Events are indexed by time and by symptom set: `query` finds events in a time range
+whose symptoms are exactly a given set or include all of given symptoms.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+LOCALIZATION = "localization"
+NIHSS = "nihss"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    session TEXT,
+    knowledge TEXT,
+    symptom_key TEXT NOT NULL,
+    symptoms TEXT NOT NULL,
+    chief_complaint TEXT NOT NULL,
+    lesion_locations TEXT,
+    affected_vessels TEXT,
+    vascular_analysis TEXT,
+    entered_scores TEXT,
+    nihss_total INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS events_symptom_key ON events (symptom_key, ts);
+CREATE TABLE IF NOT EXISTS event_symptoms (
+    symptom TEXT NOT NULL,
+    event_id INTEGER NOT NULL REFERENCES events (id)
+);
+CREATE INDEX IF NOT EXISTS event_symptoms_symptom ON event_symptoms (symptom, event_id);
+"""
+
+_COLUMNS = ("id", "ts", "kind", "session", "knowledge", "symptoms", "chief_complaint", "lesion_locations",
+            "affected_vessels", "vascular_analysis", "entered_scores", "nihss_total")
+# The events columns _row produces, in order
+_ROW_COLUMNS = ("ts", "kind", "session", "knowledge", "symptom_key", "symptoms", "chief_complaint", "lesion_locations",
+                "affected_vessels", "vascular_analysis", "entered_scores", "nihss_total")
+_INSERT = "INSERT INTO events (%s) VALUES (%s)" % (", ".join(_ROW_COLUMNS), ", ".join("?" * len(_ROW_COLUMNS)))
+_JSON_COLUMNS = {"symptoms", "lesion_locations", "affected_vessels", "vascular_analysis", "entered_scores"}
+_STOP = object()
+
+# Attempts at a failing batch before it goes to the fallback file, and the first wait
+RETRIES = 5
+RETRY_DELAY = 0.1
+
+logger = logging.getLogger(__name__)
+
+
+def default_path():
+    if os.environ.get("LOCALIZER_AUDIT_LOG"):
+        return os.environ["LOCALIZER_AUDIT_LOG"]
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "localizer", "audit.sqlite3")
+
+
+def symptom_key(symptoms):
+    """Canonical text form of a symptom set, for exact-set lookups."""
+    return "\n".join(sorted(set(symptoms)))
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class AuditLog:
+    """SQLite case log with a background batching writer; safe to share between threads."""
+
+    def __init__(self, path=None, maxsize=10000, batch_size=500):
+        self.path = path or default_path()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _connect(self.path) as connection:
+            connection.executescript(_SCHEMA)
+        connection.close()
+        self.batch_size = batch_size
+        self.written = 0
+        self.batches = 0
+        # Failed write attempts, and records written to the fallback file instead
+        self.failures = 0
+        self.spilled = 0
+        # Why the last write attempt failed, if one did
+        self.error = None
+        self.fallback_path = self.path + ".failed.jsonl"
+        self._queue = queue.Queue(maxsize)
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record_localization(self, symptoms, chief_complaint, result, session=None, knowledge=None):
+        self._put((time.time(), LOCALIZATION, session, knowledge, tuple(symptoms), chief_complaint, result, None, None))
+
+    def record_nihss(self, symptoms, chief_complaint, entered_scores, total, session=None, knowledge=None):
+        self._put((time.time(), NIHSS, session, knowledge, tuple(symptoms), chief_complaint, None,
+                   dict(entered_scores), total))
+
+    def _check_writer(self):
+        if not self._writer.is_alive():
+            raise RuntimeError("audit log writer has stopped")
+
+    def _put(self, event):
+        if self._closed:
+            raise RuntimeError("audit log is closed")
+        # Blocks while the queue is full, but not on a writer that will never drain it
+        while True:
+            self._check_writer()
+            try:
+                self._queue.put(event, timeout=1)
+                return
+            except queue.Full:
+                pass
+
+    def _row(self, event):
+        ts, kind, session, knowledge, symptoms, chief_complaint, result, entered_scores, total = event
+        if result is not None:
+            lesions = json.dumps(sorted(result.lesion_locations))
+            vessels = json.dumps(sorted(result.affected_vessels))
+            analysis = json.dumps(list(result.ranked_analysis))
+        else:
+            lesions = vessels = analysis = None
+        scores = json.dumps(entered_scores) if entered_scores is not None else None
+        return (ts, kind, session, knowledge, symptom_key(symptoms), json.dumps(list(symptoms)), chief_complaint,
+                lesions, vessels, analysis, scores, total)
+
+    def _write(self, connection, rows):
+        with connection:
+            for row, symptoms in rows:
+                cursor = connection.execute(_INSERT, row)
+                connection.executemany("INSERT INTO event_symptoms (symptom, event_id) VALUES (?, ?)",
+                                       [(s, cursor.lastrowid) for s in set(symptoms)])
+
+    def _spill(self, records):
+        """Append records that could not go to SQLite to the fallback file."""
+        with open(self.fallback_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        self.spilled += len(records)
+        logger.error("wrote %d audit record(s) to %s", len(records), self.fallback_path)
+
+    def _store(self, connection, events):
+        """Write a batch, retrying with backoff; returns the connection to use next."""
+        rows, unreadable = [], []
+        for event in events:
+            try:
+                rows.append((self._row(event), event[4]))
+            except Exception as e:
+                logger.exception("could not encode audit event")
+                unreadable.append({"event": repr(event), "error": repr(e)})
+        delay = RETRY_DELAY
+        for attempt in range(1, RETRIES + 1):
+            if not rows:
+                break
+            try:
+                if connection is None:
+                    connection = _connect(self.path)
+                self._write(connection, rows)
+                self.written += len(rows)
+                self.batches += 1
+                rows = []
+            except sqlite3.Error as e:
+                self.failures += 1
+                self.error = e
+                logger.warning("audit batch of %d failed (attempt %d/%d): %s", len(rows), attempt, RETRIES, e)
+                if connection is not None:
+                    connection.close()
+                    connection = None
+                if attempt < RETRIES:
+                    time.sleep(delay)
+                    delay *= 2
+        if rows or unreadable:
+            self._spill([*(dict(zip(_ROW_COLUMNS, row)) for row, _ in rows), *unreadable])
+        return connection
+
+    def _run(self):
+        connection = None
+        while True:
+            events = []
+            event = self._queue.get()
+            while event is not _STOP:
+                events.append(event)
+                if len(events) >= self.batch_size:
+                    break
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if events:
+                    connection = self._store(connection, events)
+            except Exception as e:
+                # Even the fallback file failed; the batch is lost, but the writer keeps going
+                self.error = e
+                logger.exception("could not write %d audit record(s)", len(events))
+            finally:
+                for _ in events:
+                    self._queue.task_done()
+            if event is _STOP:
+                self._queue.task_done()
+                break
+        if connection is not None:
+            connection.close()
+
+    def flush(self):
+        """Wait until everything recorded so far is on disk."""
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                self._check_writer()
+                self._queue.all_tasks_done.wait(1)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "written": self.written, "batches": self.batches,
+                "failures": self.failures, "spilled": self.spilled, "error": str(self.error) if self.error else None}
+
+    def query(self, **kwargs):
+        """See query_log."""
+        return query_log(self.path, **kwargs)
+
+
+def query_log(path, since=None, until=None, symptoms=None, exact=False, kind=None, limit=100):
+    """Events newest first, as dicts.
+
+    `since`/`until` are Unix times. With `symptoms`, only events whose symptom set
+    equals it (exact=True) or includes every one of them.
+    """
+    where, params = [], []
+    if since is not None:
+        where.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("ts < ?")
+        params.append(until)
+    if kind is not None:
+        where.append("kind = ?")
+        params.append(kind)
+    if symptoms is not None:
+        wanted = sorted(set(symptoms))
+        if exact:
+            where.append("symptom_key = ?")
+            params.append(symptom_key(wanted))
+        elif wanted:
+            where.append(
+                "id IN (SELECT event_id FROM event_symptoms WHERE symptom IN (%s)"
+                " GROUP BY event_id HAVING COUNT(*) = ?)" % ", ".join("?" * len(wanted))
+            )
+            params += [*wanted, len(wanted)]
+    sql = "SELECT %s FROM events" % ", ".join(_COLUMNS)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+    params.append(limit)
+
+    connection = _connect(path)
+    try:
+        rows = connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+    return [
+        {name: json.loads(value) if name in _JSON_COLUMNS and value is not None else value
+         for name, value in zip(_COLUMNS, row)}
+        for row in rows
+    ]
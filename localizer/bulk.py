@@ -0,0 +1,217 @@
+"""Bitmask symptom encoding and NumPy-vectorized rule evaluation for bulk scoring.
+
+Every multiselect option gets a bit; every rule becomes three masks (all of `when`, any
+of `any`, none of `none`). A batch of encounters is then one uint64 array, and rule
+firing, first-match-wins within each chain, and supersession are all whole-array
+operations (the syndromes are simply rules that nothing shadows):
+
+    fired     = matches & ~(earlier match in the same chain)
+    raw       = fired @ contributions
+    resolved  = raw @ lateral[hemiparesis side]
+    present   = resolved & ~(resolved @ supersedes)
+
+Supersession is order-independent in the end result: a generic location survives only if
+no specific form of it was added, and a vessel survives only if none of its descendants
+was, which is exactly what the incremental set logic in the engine converges to.
+
+Symptoms outside the vocabulary have no bit and are ignored here.
+"""
+
+import numpy as np
+
+from .engine import Localizer, Result
+from .rules import IF_NIHSS
+from .vocab import HEMIPARESIS, SYMPTOMS
+
+
+class SymptomCodec:
+    """Maps multiselect options to bit positions."""
+
+    def __init__(self, symptoms=SYMPTOMS):
+        if len(symptoms) > 64:
+            raise ValueError("SymptomCodec packs symptoms into a uint64; got %d options" % len(symptoms))
+        self.symptoms = tuple(symptoms)
+        self.bits = {s: 1 << i for i, s in enumerate(self.symptoms)}
+
+    def encode(self, symptoms):
+        mask = 0
+        for s in symptoms:
+            mask |= self.bits.get(s, 0)
+        return mask
+
+    def decode(self, mask):
+        return [s for s, bit in self.bits.items() if mask & bit]
+
+    def encode_many(self, cases):
+        return np.fromiter((self.encode(symptoms) for symptoms in cases), dtype=np.uint64)
+
+
+def _positions(mask):
+    """Indices of the set bits of an int mask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _bits(row):
+    """Bitmask of the true entries of a boolean row."""
+    mask = 0
+    for j in np.flatnonzero(row):
+        mask |= 1 << int(j)
+    return mask
+
+
+class BulkResult:
+    """Indicator matrices for a batch; row i corresponds to case i.
+
+    Columns follow the Localizer's catalog tables, so column j of a field is bit j of the
+    matching Result mask.
+    """
+
+    def __init__(self, catalog, lesion_locations, affected_vessels, ambiguity_notes, vascular_analysis,
+                 additional_vessels, infos, suggest_imaging, use_nihss):
+        self.catalog = catalog
+        self.lesion_locations = lesion_locations
+        self.affected_vessels = affected_vessels
+        self.ambiguity_notes = ambiguity_notes
+        self.vascular_analysis = vascular_analysis
+        self.additional_vessels = additional_vessels
+        self.infos = infos
+        self.suggest_imaging = suggest_imaging
+        self.use_nihss = use_nihss
+
+    def __len__(self):
+        return len(self.suggest_imaging)
+
+    def row(self, i):
+        """The engine Result for case i."""
+        return Result(
+            self.catalog,
+            _bits(self.lesion_locations[i]),
+            _bits(self.affected_vessels[i]),
+            _bits(self.ambiguity_notes[i]),
+            _bits(self.vascular_analysis[i]),
+            _bits(self.additional_vessels[i]),
+            _bits(self.infos[i]),
+            bool(self.suggest_imaging[i]),
+            bool(self.use_nihss[i]),
+        )
+
+
+class BulkScorer:
+    """Vectorized evaluation of a Localizer's rule table over many encounters at once."""
+
+    def __init__(self, localizer=None, codec=None):
+        self.localizer = localizer if localizer is not None else Localizer()
+        self.codec = codec if codec is not None else SymptomCodec(self.localizer.symptoms)
+        rules = [*(rule for chain in self.localizer.rules for rule in chain), *self.localizer.syndromes.ranked]
+        n_rules = len(rules)
+
+        # Rule masks, and for each rule the mask of rules before it in the same chain
+        self.when = np.array([self.codec.encode(r.when) for r in rules], dtype=np.uint64)
+        self.any = np.array([self.codec.encode(r.any) for r in rules], dtype=np.uint64)
+        self.none = np.array([self.codec.encode(r.none) for r in rules], dtype=np.uint64)
+        self.earlier = np.zeros((n_rules, n_rules), dtype=bool)
+        start = 0
+        for chain in self.localizer.rules:
+            for k in range(len(chain)):
+                self.earlier[start:start + k, start + k] = True
+            start += len(chain)
+        self.always = np.array([r.imaging != IF_NIHSS for r in rules])
+        self.nihss_symptoms = np.uint64(self.codec.encode(s for s in self.codec.symptoms
+                                                          if self.localizer.use_nihss({s})))
+
+        catalog = self.catalog = self.localizer.catalog
+        bits = [self.localizer.rule_bits[r.name] for r in rules]
+
+        def contributions(table, masks):
+            matrix = np.zeros((n_rules, len(table)), dtype=np.float32)
+            for k, mask in enumerate(masks):
+                matrix[k, list(_positions(mask))] = 1
+            return matrix
+
+        self.contrib = {
+            "lesion_locations": contributions(catalog.locations, (b.lesions for b in bits)),
+            "affected_vessels": contributions(catalog.vessels, (b.vessels for b in bits)),
+            "ambiguity_notes": contributions(catalog.notes, (b.notes for b in bits)),
+            "vascular_analysis": contributions(catalog.analyses, (b.analysis for b in bits)),
+            "infos": contributions(catalog.infos, (b.info for b in bits)),
+        }
+
+        # lateral[side][a, b]: location a shows as b for a hemiparesis on `side` (None: not one-sided)
+        self.hemiparesis = {side: np.uint64(self.codec.encode(symptoms)) for side, symptoms in HEMIPARESIS.items()}
+        self.lateral = {}
+        for side, pairs in catalog.lateral.items():
+            matrix = np.eye(len(catalog.locations), dtype=np.float32)
+            for relative, target in pairs:
+                matrix[relative.bit_length() - 1] = 0
+                matrix[relative.bit_length() - 1, target.bit_length() - 1] = 1
+            self.lateral[side] = matrix
+
+        # supersedes[a, b]: having a removes b
+        self.lesion_supersedes = np.zeros((len(catalog.locations),) * 2, dtype=np.float32)
+        for generic, forms in catalog.location_generics:
+            self.lesion_supersedes[list(_positions(forms)), generic.bit_length() - 1] = 1
+        self.vessel_supersedes = np.zeros((len(catalog.vessels),) * 2, dtype=np.float32)
+        for vessel, below in catalog.vessel_parents:
+            self.vessel_supersedes[list(_positions(below)), vessel.bit_length() - 1] = 1
+
+        # covers[a, v]: syndrome a already accounts for vessel v in the Territory display
+        self.covers = np.zeros((len(catalog.analyses), len(catalog.vessels)), dtype=np.float32)
+        for syndrome, covered in catalog.analysis_covers.items():
+            self.covers[syndrome.bit_length() - 1, list(_positions(covered))] = 1
+
+    def fire(self, masks):
+        """(n_cases, n_rules) bool matrix of the rule branches that fire for each mask."""
+        masks = np.asarray(masks, dtype=np.uint64)[:, None]
+        matches = (((masks & self.when) == self.when) & ((self.any == 0) | ((masks & self.any) != 0))
+                   & ((masks & self.none) == 0))
+        shadowed = (matches.astype(np.float32) @ self.earlier.astype(np.float32)) > 0
+        return matches & ~shadowed
+
+    def score_masks(self, masks, complaint_nihss=None):
+        """Score encoded symptom masks; `complaint_nihss` flags cases whose chief complaint
+        alone brings up the NIHSS calculator."""
+        masks = np.asarray(masks, dtype=np.uint64)
+        fired = self.fire(masks)
+        firedf = fired.astype(np.float32)
+
+        use_nihss = (masks & self.nihss_symptoms) != 0
+        if complaint_nihss is not None:
+            use_nihss |= np.asarray(complaint_nihss, dtype=bool)
+        suggest_imaging = (fired & self.always).any(axis=1) | (fired.any(axis=1) & use_nihss)
+
+        raw = {field: (firedf @ matrix) > 0 for field, matrix in self.contrib.items()}
+        lesions = raw["lesion_locations"]
+        if self.catalog.relative:
+            lesions = self.lateralize(masks, lesions)
+        lesions &= ~((lesions.astype(np.float32) @ self.lesion_supersedes) > 0)
+        vessels = raw["affected_vessels"]
+        vessels &= ~((vessels.astype(np.float32) @ self.vessel_supersedes) > 0)
+        analysis = raw["vascular_analysis"]
+        additional = vessels & ~((analysis.astype(np.float32) @ self.covers) > 0) & analysis.any(axis=1)[:, None]
+
+        return BulkResult(self.catalog, lesions, vessels, raw["ambiguity_notes"], analysis, additional,
+                          raw["infos"], suggest_imaging, use_nihss)
+
+    def lateralize(self, masks, lesions):
+        """Resolve relative locations row by row for the case's hemiparesis side."""
+        hits = {side: (masks & mask) != 0 for side, mask in self.hemiparesis.items()}
+        one_sided = sum(hit.astype(np.int8) for hit in hits.values()) == 1
+        lesions = lesions.astype(np.float32)
+        resolved = (lesions @ self.lateral[None]) > 0
+        for side, hit in hits.items():
+            rows = hit & one_sided
+            if rows.any():
+                resolved[rows] = (lesions[rows] @ self.lateral[side]) > 0
+        return resolved
+
+    def score(self, cases):
+        """Score an iterable of (symptoms, chief_complaint) pairs."""
+        cases = list(cases)
+        masks = self.codec.encode_many(symptoms for symptoms, _ in cases)
+        complaint_nihss = np.fromiter(
+            (self.localizer.use_nihss(set(symptoms), chief_complaint.strip()) for symptoms, chief_complaint in cases),
+            dtype=bool, count=len(cases))
+        return self.score_masks(masks, complaint_nihss)
@@ -0,0 +1,101 @@
+"""Process-wide bounded LRU/TTL cache of localization results."""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .vocab import nihss_keyword_hits
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a time-to-live, shared by every session in the process."""
+
+    def __init__(self, maxsize=1024, ttl=3600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            # Computed outside the lock; two sessions racing on the same key just both compute it.
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CachedLocalizer:
+    """Wraps a Localizer with a ResultCache keyed by the canonical case.
+
+    The key is the frozenset of selected symptoms plus the NIHSS keywords found in the
+    chief complaint, which is all of the complaint that localization looks at.
+    """
+
+    def __init__(self, localizer, cache=None):
+        self.localizer = localizer
+        self.cache = cache if cache is not None else ResultCache()
+
+    def __getattr__(self, name):
+        return getattr(self.localizer, name)
+
+    @staticmethod
+    def key(symptoms, chief_complaint=""):
+        return frozenset(symptoms), nihss_keyword_hits(chief_complaint)
+
+    def localize(self, symptoms, chief_complaint="", **kwargs):
+        metrics = self.localizer.metrics
+        if metrics.enabled:
+            start = time.perf_counter()
+        result = self.cache.get_or_compute(
+            self.key(symptoms, chief_complaint),
+            lambda: self.localizer.localize(symptoms, chief_complaint, **kwargs),
+        )
+        if metrics.enabled:
+            # Whole call, cache lookup included
+            metrics.lap("localize", start)
+        return result
@@ -0,0 +1,145 @@
+"""Interned names for everything a rule table can produce.
+
+Each kind of output (locations, vessels, notes, syndromes, infos) gets a NameTable that
+numbers its canonical names once. A set of them is then a plain int with bit i set for
+name i, so the engine merges rule contributions with `|`, supersession and the
+covered-by filter are a few mask tests, and a Result is a handful of ints: cheap to
+hash, compare and pickle. Names are only produced again by decoding, at render time.
+"""
+
+from typing import NamedTuple
+
+from .anatomy import SPINAL_CORD, Location
+
+
+class NameTable:
+    """Canonical names of one kind, in first-seen order; bit i stands for names[i]."""
+
+    __slots__ = ("names", "bits")
+
+    def __init__(self, names):
+        self.names = tuple(dict.fromkeys(names))
+        self.bits = {name: 1 << i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, names):
+        mask = 0
+        for name in names:
+            mask |= self.bits[name]
+        return mask
+
+    def decode(self, mask):
+        """Names of the set bits, in table order."""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return tuple(names)
+
+
+class RuleBits(NamedTuple):
+    """A rule's contributions as masks over the Catalog tables."""
+    lesions: int
+    vessels: int
+    notes: int
+    analysis: int
+    info: int
+
+
+class Catalog:
+    """NameTables for one compiled rule table, plus the masks supersession needs."""
+
+    def __init__(self, rules, standard_lesions, standard_vessels, vessels, syndromes=(), graph=None):
+        if graph is None:
+            from .graph import AnatomyGraph
+            graph = AnatomyGraph(ontology=vessels)
+        # Syndromes come ranked, so their analyses decode most specific first
+        flat = [*syndromes, *(rule for chain in rules for rule in chain)]
+        locations = {standard_lesions[loc].name: standard_lesions[loc] for rule in flat for loc in rule.lesions}
+        # A location named relative to the deficit ("Contralateral Thalamus") becomes a side
+        # form of its structure, or the generic one when the side is unknown; intern those too.
+        sides = (None, *graph.sides)
+        relative = [location for location in locations.values() if location.laterality]
+        for location in relative:
+            structure = location.structure
+            for side in sides:
+                name = graph.resolve(structure.name, location.laterality, side)
+                locations.setdefault(name, Location(name, structure, name != structure.name))
+        self.locations = NameTable(locations)
+        self.vessels = NameTable([*vessels.ids, *(standard_vessels[v] for rule in flat for v in rule.vessels)])
+        self.notes = NameTable(note for rule in flat for note in rule.notes)
+        self.analyses = NameTable(desc for rule in flat for desc in rule.analysis)
+        self.infos = NameTable(info for rule in flat for info in rule.info)
+
+        # (generic bit, mask of its specific forms): the generic is dropped when any form is present
+        self.location_generics = tuple(
+            (self.locations.bits[name], self.locations.encode(form for form in location.structure.forms if form in self.locations.bits))
+            for name, location in locations.items()
+            if location.structure is not None and not location.specific and not location.laterality
+        )
+        # Relative locations, and for each hemiparesis side (None: unknown) what they resolve to
+        self.relative = self.locations.encode(location.name for location in relative)
+        self.lateral = {
+            side: tuple(
+                (self.locations.bits[location.name],
+                 self.locations.bits[graph.resolve(location.structure.name, location.laterality, side)])
+                for location in relative
+            )
+            for side in sides
+        }
+        # Locations in the spinal cord
+        self.spinal = self.locations.encode(
+            name for name in self.locations.names if graph.contains(SPINAL_CORD, graph.locate(name))
+        )
+        # (vessel bit, mask of its descendants): a vessel is dropped when a more specific one is present
+        self.vessel_parents = tuple(
+            (self.vessels.bits[name], self.vessels.encode(below))
+            for name, below in vessels.descendants.items() if below
+        )
+        # syndrome bit -> vessels it accounts for in the Territory display
+        self.analysis_covers = {
+            self.analyses.bits[desc]: self.vessels.encode(vessels.covered_by({vessels.standardize(desc)}) & self.vessels.bits.keys())
+            for desc in self.analyses.names
+        }
+
+    def rule_bits(self, rule, standard_lesions, standard_vessels):
+        return RuleBits(
+            lesions=self.locations.encode(standard_lesions[loc].name for loc in rule.lesions),
+            vessels=self.vessels.encode(standard_vessels[v] for v in rule.vessels),
+            notes=self.notes.encode(rule.notes),
+            analysis=self.analyses.encode(rule.analysis),
+            info=self.infos.encode(rule.info),
+        )
+
+    def lateralize(self, mask, side=None):
+        """Resolve relative locations for a deficit on `side` ("Right"/"Left", None if unknown)."""
+        if mask & self.relative:
+            for bit, target in self.lateral[side]:
+                if mask & bit:
+                    mask = mask ^ bit | target
+        return mask
+
+    def supersede_locations(self, mask):
+        for bit, forms in self.location_generics:
+            if mask & bit and mask & forms:
+                mask ^= bit
+        return mask
+
+    def supersede_vessels(self, mask):
+        for bit, below in self.vessel_parents:
+            if mask & bit and mask & below:
+                mask ^= bit
+        return mask
+
+    def additional(self, vessels, analysis):
+        """Vessels not already accounted for by a syndrome in `analysis` (0 when there is none)."""
+        if not analysis:
+            return 0
+        covered = 0
+        for bit, covers in self.analysis_covers.items():
+            if analysis & bit:
+                covered |= covers
+        return vessels & ~covered
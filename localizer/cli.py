@@ -0,0 +1,306 @@
+"""Command-line entry point: `python -m localizer batch cases.jsonl -o results.jsonl`.
+
+Cases are streamed from JSONL (one {"symptoms": [...], "chief_complaint": "..."} object
+per line) or CSV (`symptoms` column separated by --separator, `chief_complaint` column).
+Any `id` field is copied to the output. Cases are localized in chunks across a process
+pool with a bounded number of chunks in flight, and results are written in input order
+as they complete, so memory use does not grow with the input size. A JSONL line that is
+not a case is reported on stderr with its line number and skipped, and the command then
+exits with status 1.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from .engine import localize
+
+RESULT_FIELDS = (
+    "lesion_locations", "affected_vessels", "ambiguity_notes", "vascular_analysis",
+    "additional_vessels", "infos", "suggest_imaging", "use_nihss",
+)
+
+
+class CaseError(ValueError):
+    """An input line that is not a case."""
+
+
+def _format_of(path, explicit):
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _case(line):
+    try:
+        case = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise CaseError(f"invalid JSON ({e.msg})") from None
+    if not isinstance(case, dict):
+        raise CaseError("each case must be an object")
+    symptoms = case.get("symptoms") or []
+    chief_complaint = case.get("chief_complaint") or ""
+    # A bare string would otherwise be split into characters that match nothing
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        raise CaseError("'symptoms' must be a list of strings")
+    if not isinstance(chief_complaint, str):
+        raise CaseError("'chief_complaint' must be a string")
+    return case.get("id"), symptoms, chief_complaint
+
+
+def read_cases(stream, fmt, separator=";", skip=None):
+    """Yield (id, symptoms, chief_complaint) tuples from a JSONL or CSV stream.
+
+    A JSONL line that is not a case is left out and reported as skip(line number,
+    reason); without `skip` it raises CaseError.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            raw = row.get("symptoms") or ""
+            symptoms = [s.strip() for s in raw.split(separator) if s.strip()]
+            yield row.get("id"), symptoms, row.get("chief_complaint") or ""
+        return
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            case = _case(line)
+        except CaseError as e:
+            if skip is None:
+                raise CaseError(f"line {number}: {e}") from None
+            skip(number, str(e))
+            continue
+        yield case
+
+
+def localize_chunk(cases):
+    """Localize a list of cases; runs inside the worker processes."""
+    return [(case_id, localize(symptoms, chief_complaint).to_dict()) for case_id, symptoms, chief_complaint in cases]
+
+
+_scorer = None
+
+
+def score_chunk(cases):
+    """Like localize_chunk, but evaluates the whole chunk as NumPy array operations."""
+    global _scorer
+    if _scorer is None:
+        from .bulk import BulkScorer
+        _scorer = BulkScorer()
+    scored = _scorer.score((symptoms, chief_complaint) for _, symptoms, chief_complaint in cases)
+    return [(case[0], scored.row(i).to_dict()) for i, case in enumerate(cases)]
+
+
+class _Writer:
+    def __init__(self, stream, fmt, separator):
+        self.stream = stream
+        self.separator = separator
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.writer(stream)
+            self.csv.writerow(("id",) + RESULT_FIELDS)
+
+    def write(self, case_id, result):
+        if self.csv is None:
+            record = {"id": case_id} if case_id is not None else {}
+            record.update(result)
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        row = [case_id if case_id is not None else ""]
+        for field in RESULT_FIELDS:
+            value = result[field]
+            row.append(self.separator.join(value) if isinstance(value, list) else value)
+        self.csv.writerow(row)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_batch(cases, write, workers=None, chunk_size=1000, max_pending=None, vectorized=False):
+    """Localize `cases` and pass each (id, result dict) to `write` in input order.
+
+    With workers=0 everything runs in this process. Returns the number of cases.
+    """
+    work = score_chunk if vectorized else localize_chunk
+    count = 0
+    if workers == 0:
+        for chunk in _chunks(cases, chunk_size):
+            for case_id, result in work(chunk):
+                write(case_id, result)
+            count += len(chunk)
+        return count
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(cases, chunk_size):
+            pending.append(pool.submit(work, chunk))
+            if len(pending) >= max_pending:
+                count += _drain(pending.popleft(), write)
+        while pending:
+            count += _drain(pending.popleft(), write)
+    return count
+
+
+def _drain(future, write):
+    results = future.result()
+    for case_id, result in results:
+        write(case_id, result)
+    return len(results)
+
+
+def batch(args):
+    in_fmt = _format_of(args.input, args.format)
+    out_fmt = _format_of(args.output or "", args.output_format)
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    target = sys.stdout if not args.output or args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    skipped = 0
+
+    def skip(number, reason):
+        nonlocal skipped
+        skipped += 1
+        print(f"{args.input}: skipped line {number}: {reason}", file=sys.stderr)
+
+    try:
+        writer = _Writer(target, out_fmt, args.separator)
+        start = time.perf_counter()
+        count = run_batch(read_cases(source, in_fmt, args.separator, skip), writer.write,
+                          workers=args.workers, chunk_size=args.chunk_size, vectorized=args.vectorized)
+        elapsed = time.perf_counter() - start
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"Localized {count} cases in {elapsed:.2f}s ({rate:,.0f} cases/s); {skipped} malformed line(s) skipped",
+          file=sys.stderr)
+    return 1 if skipped else 0
+
+
+def compile_command(args):
+    from .knowledge import KnowledgeBaseError, load_file
+
+    try:
+        knowledge = load_file(args.path, args.cache_dir)
+    except KnowledgeBaseError as e:
+        print(f"Invalid rule file: {e}", file=sys.stderr)
+        return 1
+    n_rules = sum(len(chain) for chain in knowledge.chains)
+    print(f"{args.path}: version {knowledge.version}, {len(knowledge.chains)} chains, {n_rules} rules, "
+          f"{len(knowledge.syndromes)} syndromes, sha256 {knowledge.sha256[:16]}")
+    return 0
+
+
+def review_command(args):
+    from .review import review
+
+    return review(args)
+
+
+def _timestamp(value):
+    """Unix time from a number or an ISO 8601 date/time."""
+    from datetime import datetime
+
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def audit_command(args):
+    from .audit import default_path, query_log
+
+    path = args.path or default_path()
+    if not os.path.exists(path):
+        print(f"No audit log at {path}", file=sys.stderr)
+        return 1
+    events = query_log(path, since=args.since, until=args.until, symptoms=args.symptom, exact=args.exact,
+                       kind=args.kind, limit=args.limit)
+    for event in events:
+        print(json.dumps(event))
+    return 0
+
+
+def serve_command(args):
+    from .server import serve
+
+    serve(args.host, args.port, max_concurrency=args.max_concurrency, max_pipeline=args.max_pipeline,
+          metrics=args.metrics)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m localizer", description="Headless stroke localization.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("batch", help="Localize a JSONL/CSV file of cases.")
+    p.add_argument("input", help="JSONL or CSV file of cases ('-' for stdin)")
+    p.add_argument("-o", "--output", help="Output file (default stdout); .csv writes CSV, anything else JSONL")
+    p.add_argument("--format", choices=("jsonl", "csv"), help="Input format (default from the file extension)")
+    p.add_argument("--output-format", choices=("jsonl", "csv"), help="Output format (default from the file extension)")
+    p.add_argument("--separator", default=";", help="Separator for list values in CSV (default ';')")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0: no pool)")
+    p.add_argument("--chunk-size", type=int, default=1000, help="Cases per work unit (default 1000)")
+    p.add_argument("--vectorized", action="store_true", help="Score each chunk with NumPy bitmask evaluation")
+    p.set_defaults(func=batch)
+
+    from .knowledge import DEFAULT_PATH
+
+    p = commands.add_parser("compile", help="Validate a rule file and write its compiled snapshot.")
+    p.add_argument("path", nargs="?", default=DEFAULT_PATH, help="Rule file (default: the bundled rules.json)")
+    p.add_argument("--cache-dir", help="Snapshot directory (default $LOCALIZER_CACHE_DIR or ~/.cache/localizer)")
+    p.set_defaults(func=compile_command)
+
+    p = commands.add_parser("review", help="Extract symptoms from a large note export and localize each note.")
+    p.add_argument("input", help="Note export: JSONL records or plain text records")
+    p.add_argument("-o", "--output", required=True, help="Directory for the part files and checkpoint manifest")
+    p.add_argument("--format", choices=("jsonl", "text"), default="jsonl", help="Input format (default jsonl)")
+    p.add_argument("--separator", help="Record separator, with backslash escapes (default: new line for JSONL, blank line for text)")
+    p.add_argument("--id-field", default="id", help="JSONL field holding the record id (default 'id'; text records use the byte offset)")
+    p.add_argument("--text-field", default="text", help="JSONL field holding the note (default 'text')")
+    p.add_argument("--output-format", choices=("csv", "parquet"), default="csv", help="Part file format (default csv)")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0: no pool)")
+    p.add_argument("--shard-size", type=int, default=64, help="MiB of input per shard and part file (default 64)")
+    p.add_argument("--chunk-rows", type=int, default=10000, help="Rows buffered before each write (default 10000)")
+    p.set_defaults(func=review_command)
+
+    p = commands.add_parser("audit", help="Query the audit log of localizations and NIHSS totals.")
+    p.add_argument("path", nargs="?", help="Audit database (default $LOCALIZER_AUDIT_LOG or ~/.local/share/localizer/audit.sqlite3)")
+    p.add_argument("--since", type=_timestamp, help="Events at or after this Unix time or ISO 8601 date/time")
+    p.add_argument("--until", type=_timestamp, help="Events before this Unix time or ISO 8601 date/time")
+    p.add_argument("--symptom", action="append", help="Events including this symptom (repeatable)")
+    p.add_argument("--exact", action="store_true", help="Events whose symptoms are exactly the --symptom set")
+    p.add_argument("--kind", choices=("localization", "nihss"), help="Only this kind of event")
+    p.add_argument("--limit", type=int, default=100, help="Newest events to print (default 100)")
+    p.set_defaults(func=audit_command)
+
+    p = commands.add_parser("serve", help="Serve the JSON HTTP API (see localizer/server.py).")
+    p.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port to listen on (default 8765)")
+    p.add_argument("--max-concurrency", type=int, default=64, help="Requests handled at once across all connections (default 64)")
+    p.add_argument("--max-pipeline", type=int, default=32, help="Pipelined requests in progress per connection (default 32)")
+    p.add_argument("--metrics", action="store_true", help="Record per-stage and per-rule timings for GET /metrics")
+    p.set_defaults(func=serve_command)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,201 @@
+"""Localization engine: symptoms + chief complaint -> lesion locations and vascular territory."""
+
+import time
+from typing import NamedTuple
+
+from .anatomy import AnatomyMatcher
+from .catalog import Catalog
+from .graph import AnatomyGraph
+from .knowledge import load_knowledge
+from .metrics import registry
+from .reverse import ReverseIndex
+from .rules import IF_NIHSS
+from .syndromes import SyndromeIndex
+from .vessels import VesselOntology
+from .vocab import HEMIPARESIS, NIHSS_SYMPTOMS, SYMPTOMS, has_nihss_keyword
+
+
+class Result(NamedTuple):
+    """Everything the "Considers" / "Territory" / "Next Steps" sections need.
+
+    Sets are held as bitmasks over the catalog's name tables; the properties below turn
+    them back into names for rendering and export.
+    """
+    catalog: Catalog
+    lesion_bits: int
+    vessel_bits: int
+    note_bits: int
+    analysis_bits: int
+    # Vessels not already explained by a matched syndrome (only set when analysis_bits is)
+    additional_bits: int
+    # Notes shown straight away, before the results sections
+    info_bits: int
+    suggest_imaging: bool
+    use_nihss: bool
+
+    @property
+    def lesion_locations(self):
+        return frozenset(self.catalog.locations.decode(self.lesion_bits))
+
+    @property
+    def affected_vessels(self):
+        return frozenset(self.catalog.vessels.decode(self.vessel_bits))
+
+    @property
+    def ambiguity_notes(self):
+        return frozenset(self.catalog.notes.decode(self.note_bits))
+
+    @property
+    def vascular_analysis(self):
+        return frozenset(self.catalog.analyses.decode(self.analysis_bits))
+
+    @property
+    def ranked_analysis(self):
+        # The analyses table lists syndromes most specific first
+        return self.catalog.analyses.decode(self.analysis_bits)
+
+    @property
+    def additional_vessels(self):
+        return frozenset(self.catalog.vessels.decode(self.additional_bits))
+
+    @property
+    def infos(self):
+        # Table order is rule order, which is the order the infos are shown in
+        return self.catalog.infos.decode(self.info_bits)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields[1:])
+        return f"Result({fields})"
+
+    def to_dict(self):
+        """JSON-friendly form with sets as sorted lists (syndromes ranked), matching the on-screen order."""
+        return {
+            "lesion_locations": sorted(self.lesion_locations),
+            "affected_vessels": sorted(self.affected_vessels),
+            "ambiguity_notes": sorted(self.ambiguity_notes),
+            "vascular_analysis": list(self.ranked_analysis),
+            "additional_vessels": sorted(self.additional_vessels),
+            "infos": list(self.infos),
+            "suggest_imaging": self.suggest_imaging,
+            "use_nihss": self.use_nihss,
+        }
+
+
+class Localizer:
+    """Holds the compiled rule table; build once and call `localize` per request."""
+
+    def __init__(self, knowledge=None, anatomy=None, vessels=None, metrics=None):
+        self.knowledge = knowledge if knowledge is not None else load_knowledge()
+        self.metrics = metrics if metrics is not None else registry
+        self.rules = self.knowledge.chains
+        self.anatomy = anatomy if anatomy is not None else AnatomyMatcher()
+        self.vessels = vessels if vessels is not None else VesselOntology()
+        self.graph = AnatomyGraph(ontology=self.vessels)
+        self.symptoms = SYMPTOMS
+        self.syndromes = SyndromeIndex(self.knowledge.syndromes, self.symptoms)
+        every_rule = [*(rule for chain in self.rules for rule in chain), *self.syndromes.ranked]
+        # Lesion and vessel names in the rules are fixed, so standardize them up front.
+        self.standard_lesions = {
+            location: self.anatomy.standardize_relative(location) for rule in every_rule for location in rule.lesions
+        }
+        self.standard_vessels = {
+            vessel: self.vessels.standardize(vessel) for rule in every_rule for vessel in rule.vessels
+        }
+        # Every output name interned once; each rule's contributions become masks.
+        self.catalog = Catalog(self.rules, self.standard_lesions, self.standard_vessels, self.vessels,
+                               self.syndromes.ranked, self.graph)
+        self.rule_bits = {
+            rule.name: self.catalog.rule_bits(rule, self.standard_lesions, self.standard_vessels)
+            for rule in every_rule
+        }
+        self._reverse = None
+
+    @property
+    def reverse(self):
+        """ReverseIndex (lesion site or vessel -> symptoms and syndromes), built on first use."""
+        if self._reverse is None:
+            self._reverse = ReverseIndex(self)
+        return self._reverse
+
+    def use_nihss(self, selected, chief_complaint=""):
+        # Determine if NIHSS should be used
+        if any(s in NIHSS_SYMPTOMS or (s not in SYMPTOMS and has_nihss_keyword(s)) for s in selected):
+            return True
+        return bool(chief_complaint) and has_nihss_keyword(chief_complaint)
+
+    def hemiparesis_side(self, selected):
+        """"Right" or "Left" when hemiparesis is selected on that side only, else None."""
+        right = not HEMIPARESIS["Right"].isdisjoint(selected)
+        left = not HEMIPARESIS["Left"].isdisjoint(selected)
+        if right != left:
+            return "Right" if right else "Left"
+        return None
+
+    def localize(self, symptoms, chief_complaint=""):
+        # Timing is checked once per call, so disabled instrumentation costs a few branches
+        metrics = self.metrics
+        timed = metrics.enabled
+        if timed:
+            start = time.perf_counter()
+        selected = frozenset(symptoms)
+        use_nihss = self.use_nihss(selected, chief_complaint.strip())
+        if timed:
+            start = rules_start = metrics.lap("nihss_keywords", start)
+
+        lesions = vessels = notes = analysis = infos = 0
+        suggest_imaging = False
+
+        for name, chain in zip(self.knowledge.chain_names, self.rules):
+            fired = None
+            for rule in chain:
+                if rule.matches(selected):
+                    fired = rule
+                    break
+            if fired is not None:
+                bits = self.rule_bits[fired.name]
+                lesions |= bits.lesions
+                vessels |= bits.vessels
+                notes |= bits.notes
+                analysis |= bits.analysis
+                infos |= bits.info
+                if fired.imaging != IF_NIHSS or use_nihss:
+                    suggest_imaging = True
+            if timed:
+                start = metrics.lap_chain(name, fired, start)
+
+        # Every satisfied syndrome applies
+        matched = self.syndromes.match(selected)
+        for rule in matched:
+            bits = self.rule_bits[rule.name]
+            lesions |= bits.lesions
+            vessels |= bits.vessels
+            notes |= bits.notes
+            analysis |= bits.analysis
+            infos |= bits.info
+            if rule.imaging != IF_NIHSS or use_nihss:
+                suggest_imaging = True
+        if timed:
+            metrics.lap_syndromes(matched, start)
+            start = metrics.lap("rules", rules_start)
+
+        # Relative locations take the hemiparesis side; specific locations and vessels then
+        # supersede the generic ones they refine
+        catalog = self.catalog
+        lesions = catalog.supersede_locations(catalog.lateralize(lesions, self.hemiparesis_side(selected)))
+        vessels = catalog.supersede_vessels(vessels)
+        additional = catalog.additional(vessels, analysis)
+        if timed:
+            metrics.lap("covered_by", start)
+
+        return Result(catalog, lesions, vessels, notes, analysis, additional, infos, suggest_imaging, use_nihss)
+
+
+_default = None
+
+
+def localize(symptoms, chief_complaint=""):
+    """Localize with a process-wide default Localizer (built on first use)."""
+    global _default
+    if _default is None:
+        _default = Localizer()
+    return _default.localize(symptoms, chief_complaint)
@@ -0,0 +1,277 @@
+"""Free-text symptom extraction: map a chief complaint or pasted note onto SYMPTOMS.
+
+Text is lower-cased and split into word tokens, commas and clause breaks (. ; : ! ? and
+new lines). A token trie built once from the synonym table below, together with the
+negation cues, is walked from every token taking the longest phrase, so a note costs
+O(tokens x longest phrase) however many synonyms there are.
+
+Negation follows NegEx: a cue such as "no", "denies", "without" or "no longer" negates
+the findings in the next few tokens of its clause, and every comma, "and" or "or"
+renews that reach, so a review-of-systems list ("denies headache, nausea, ..., vertigo")
+is negated to its end. "but", "however" and affirming words ("has", "with", "reports",
+...) end the scope. A trailing cue ("resolved", "was denied", "ruled out") negates
+only the finding just before it in the same comma-separated item, so "aphasia, CT head
+negative" keeps the aphasia. Pseudo-cues such as "not only" or "not resolved" are
+matched as phrases of their own so they do not trigger negation.
+"""
+
+import re
+from typing import NamedTuple
+
+from .vocab import SYMPTOMS
+
+_SIDES = ("right", "left")
+
+
+def _sided(option, phrases):
+    """Expand '{side}' in both the option and its phrases for the right and left side."""
+    return tuple(
+        (option.format(side=side.capitalize()), tuple(p.format(side=side) for p in phrases))
+        for side in _SIDES
+    )
+
+
+# Multiselect option -> lower-case phrases that mean it.
+SYMPTOM_SYNONYMS = (
+    *_sided("{side} hemiparesis (Upper & Lower equally)", (
+        "{side} hemiparesis", "{side} hemiplegia", "{side} sided weakness", "{side} side weakness",
+        "{side} weakness", "weakness on the {side}", "weakness of the {side} side", "{side} arm and leg weakness",
+        "weakness of the {side} arm and leg", "weakness in the {side} arm and leg",
+    )),
+    *_sided("{side} hemiparesis (Upper> Lower)", (
+        "{side} arm weakness", "weakness of the {side} arm", "weakness in the {side} arm",
+        "{side} arm weaker than leg", "{side} arm more than leg", "{side} brachiofacial weakness",
+    )),
+    *_sided("{side} hemiparesis (Lower> Upper)", (
+        "{side} leg weakness", "weakness of the {side} leg", "weakness in the {side} leg",
+        "{side} leg weaker than arm", "{side} leg more than arm",
+    )),
+    ("Aphasia", (
+        "aphasia", "aphasic", "dysphasia", "dysphasic", "expressive aphasia", "receptive aphasia", "global aphasia",
+        "word finding difficulty", "word finding difficulties", "trouble finding words", "nonfluent speech",
+        "non fluent speech", "unable to understand speech",
+    )),
+    ("Neglect", ("neglect", "hemineglect", "hemispatial neglect", "inattention", "extinction")),
+    ("Facial palsy (Upper & Lower face equally affected)", (
+        "bell's palsy", "bells palsy", "complete facial palsy", "complete facial paralysis", "forehead involvement",
+        "facial palsy involving the forehead", "peripheral facial palsy", "lower motor neuron facial palsy",
+    )),
+    ("Facial palsy (Lower face only affected)", (
+        "facial palsy", "facial droop", "face droop", "facial weakness", "facial asymmetry", "mouth droop",
+        "central facial palsy", "lower facial weakness", "forehead sparing", "upper motor neuron facial palsy",
+    )),
+    ("Vertigo", ("vertigo", "vertiginous", "room spinning", "room is spinning", "spinning sensation")),
+    ("Dysarthria", ("dysarthria", "dysarthric", "slurred speech", "slurring of speech", "slurred words", "slurring")),
+    ("Partial seizure", (
+        "partial seizure", "partial seizures", "focal seizure", "focal seizures", "focal motor seizure",
+        "jacksonian march",
+    )),
+    ("Generalized seizure", (
+        "generalized seizure", "generalised seizure", "generalized seizures", "tonic clonic", "grand mal",
+        "convulsion", "convulsions",
+    )),
+    ("Emotional disturbances", (
+        "emotional disturbance", "emotional disturbances", "emotional lability", "pseudobulbar affect",
+        "apathy", "abulia", "disinhibition", "personality change",
+    )),
+    ("Vision loss (Homonymous Hemianopia)", (
+        "hemianopia", "homonymous hemianopia", "hemianopsia", "visual field cut", "visual field defect", "field cut",
+    )),
+    ("Vision loss (Unilateral - optic nerve related)", (
+        "amaurosis fugax", "monocular vision loss", "monocular blindness", "vision loss in one eye",
+        "loss of vision in one eye", "blind in one eye", "optic neuropathy",
+    )),
+    ("Ataxia (Limb)", (
+        "limb ataxia", "dysmetria", "intention tremor", "past pointing", "dysdiadochokinesia", "finger nose ataxia",
+    )),
+    ("Ataxia (Truncal)", (
+        "truncal ataxia", "gait ataxia", "ataxic gait", "unsteady gait", "wide based gait", "titubation",
+        "unable to sit unsupported",
+    )),
+    ("Sensory loss (Hemibody, all modalities)", (
+        "hemisensory loss", "hemianesthesia", "hemibody numbness", "hemibody sensory loss",
+        *(p.format(side=side) for side in _SIDES for p in (
+            "{side} sided numbness", "{side} side numbness", "numbness of the {side} side", "{side} hemisensory loss",
+            "{side} body numbness",
+        )),
+    )),
+    ("Sensory loss (Dissociated - e.g. pain/temp affected, light touch spared)", (
+        "dissociated sensory loss", "crossed sensory loss", "loss of pain and temperature",
+        "pain and temperature loss", "loss of pain and temperature sensation",
+    )),
+    ("Tongue deviation", ("tongue deviation", "tongue deviates", "tongue deviating", "deviation of the tongue")),
+    ("Horner’s syndrome", (
+        "horner's syndrome", "horners syndrome", "horner syndrome", "horner's", "ptosis and miosis",
+        "miosis and ptosis",
+    )),
+    ("Gaze palsy (Conjugate, toward lesion)", (
+        "gaze deviation toward the lesion", "gaze preference", "gaze deviation", "forced gaze deviation",
+        "eyes deviated toward the lesion",
+    )),
+    ("Gaze palsy (Conjugate, away from lesion)", (
+        "gaze deviation away from the lesion", "eyes deviated away from the lesion", "wrong way eyes",
+        "wrong way gaze",
+    )),
+    ("Gaze palsy (Internuclear Ophthalmoplegia - INO)", ("internuclear ophthalmoplegia", "ino", "mlf syndrome")),
+    ("Vertical gaze palsy", (
+        "vertical gaze palsy", "upgaze palsy", "up gaze palsy", "impaired upgaze", "parinaud syndrome",
+        "parinaud's syndrome", "dorsal midbrain syndrome",
+    )),
+    ("Oculomotor palsy (CN III - ptosis, eye down & out)", (
+        "oculomotor palsy", "oculomotor nerve palsy", "third nerve palsy", "3rd nerve palsy", "cn iii palsy",
+        "cn 3 palsy", "eye down and out", "blown pupil",
+    )),
+    ("Abducens palsy (CN VI - impaired abduction)", (
+        "abducens palsy", "abducens nerve palsy", "sixth nerve palsy", "6th nerve palsy", "cn vi palsy",
+        "cn 6 palsy", "impaired abduction", "unable to abduct",
+    )),
+    ("Decreased level of consciousness (drowsy/stuporous)", (
+        "decreased level of consciousness", "reduced level of consciousness", "decreased consciousness",
+        "altered consciousness", "obtunded", "stuporous", "stupor", "somnolent", "drowsy", "difficult to rouse",
+    )),
+    ("Chorea", ("chorea", "choreiform", "choreic movements", "choreoathetosis")),
+    ("Hemiballism", ("hemiballism", "hemiballismus", "ballism", "ballismus", "flinging movements")),
+    ("Nystagmus", ("nystagmus",)),
+    ("Hiccup (Persistent/Intractable)", (
+        "hiccup", "hiccups", "hiccough", "hiccoughs", "singultus", "persistent hiccups", "intractable hiccups",
+    )),
+)
+
+# Negation cues before the finding, after it, scope terminators, and look-alikes that are not negations.
+PRE_NEGATION = (
+    "no", "not", "denies", "denied", "deny", "without", "negative for", "free of", "absence of",
+    "no evidence of", "no signs of", "never", "no longer", "no longer has", "no longer have",
+)
+# "denied" alone is a pre-cue ("denied vertigo"); after the finding it comes with its verb.
+POST_NEGATION = (
+    "absent", "was denied", "were denied", "is denied", "are denied", "resolved", "ruled out", "not present",
+    "negative", "unlikely",
+)
+TERMINATORS = (
+    "but", "however", "although", "though", "except", "yet", "apart from", "presents", "presenting",
+    "reports", "complains", "endorses", "has", "with",
+)
+PSEUDO_NEGATION = (
+    "not only", "no change in", "no improvement in", "not resolved", "has not resolved",
+    "not improved", "no improvement",
+)
+
+# Tokens a pre-negation cue reaches past its last list separator, so "no fever ... slurred
+# speech" far along the clause is not negated.
+NEGATION_WINDOW = 10
+
+_PRE, _POST, _TERM, _PSEUDO, _SYMPTOM = range(5)
+_END = ""  # trie key holding the phrase value; never a token
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[.;:!?\n,]")
+_BREAKS = frozenset(".;:!?\n")
+_LIST = frozenset((",", "and", "or", "nor"))
+
+
+class Extraction(NamedTuple):
+    # Options mentioned without negation, in SYMPTOMS order
+    present: tuple
+    # Options only ever mentioned negated
+    negated: tuple
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower().replace("’", "'"))
+
+
+class SymptomExtractor:
+    """Compiled phrase trie; build once and call `extract` per text."""
+
+    def __init__(self, synonyms=SYMPTOM_SYNONYMS, symptoms=SYMPTOMS):
+        self.order = {symptom: i for i, symptom in enumerate(symptoms)}
+        self.trie = {}
+        self.longest = 0
+        # Later entries only fill gaps, so a phrase listed under two kinds keeps the first.
+        for kind, phrases in ((_PSEUDO, PSEUDO_NEGATION), (_PRE, PRE_NEGATION), (_POST, POST_NEGATION),
+                              (_TERM, TERMINATORS)):
+            for phrase in phrases:
+                self._insert(phrase, (kind, None))
+        for symptom, phrases in synonyms:
+            if symptom not in self.order:
+                raise ValueError(f"synonyms given for unknown symptom {symptom!r}")
+            for phrase in phrases:
+                self._insert(phrase, (_SYMPTOM, symptom))
+
+    def _insert(self, phrase, value):
+        tokens = tokenize(phrase)
+        node = self.trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_END, value)
+        self.longest = max(self.longest, len(tokens))
+
+    def _longest_match(self, tokens, start):
+        node = self.trie
+        found = None
+        for i in range(start, min(len(tokens), start + self.longest)):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if _END in node:
+                found = node[_END], i + 1
+        return found
+
+    def extract(self, text):
+        """Symptoms mentioned in `text`, split into present and negated."""
+        tokens = tokenize(text)
+        mentions = []  # [symptom, negated]
+        last = None    # the latest mention in the current comma-separated item, for trailing cues
+        scope = 0      # tokens still covered by a preceding cue
+        i = 0
+        while i < len(tokens):
+            if tokens[i] in _BREAKS:
+                scope = 0
+                last = None
+                i += 1
+                continue
+            if tokens[i] in _LIST:
+                if tokens[i] == ",":
+                    last = None
+                # A negated list runs on item by item until the clause ends
+                if scope:
+                    scope = NEGATION_WINDOW
+                i += 1
+                continue
+            match = self._longest_match(tokens, i)
+            if match is None:
+                scope = max(0, scope - 1)
+                i += 1
+                continue
+            (kind, symptom), end = match
+            if kind == _PRE:
+                scope = NEGATION_WINDOW
+            else:
+                if kind == _SYMPTOM:
+                    mention = [symptom, scope > 0]
+                    mentions.append(mention)
+                    last = mention
+                elif kind == _POST:
+                    if last is not None:
+                        last[1] = True
+                elif kind == _TERM:
+                    scope = 0
+                    last = None
+                scope = max(0, scope - (end - i))
+            i = end
+
+        present = {symptom for symptom, negated in mentions if not negated}
+        negated = {symptom for symptom, negated in mentions if negated} - present
+        return Extraction(
+            present=tuple(sorted(present, key=self.order.__getitem__)),
+            negated=tuple(sorted(negated, key=self.order.__getitem__)),
+        )
+
+
+_default = None
+
+
+def extract_symptoms(text):
+    """Extract with a process-wide default SymptomExtractor (built on first use)."""
+    global _default
+    if _default is None:
+        _default = SymptomExtractor()
+    return _default.extract(text)
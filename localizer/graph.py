@@ -0,0 +1,220 @@
+"""Anatomy/vascular knowledge graph: structures, vessels and typed edges between them.
+
+Structures are linked by `side` edges (a generic structure to its Right/Left forms, from
+anatomy.SIDED_STRUCTURES) and `contains` edges (the brainstem and its parts, the spinal
+cord, the cerebellum, ...); structures point at vessels by `supplied_by` edges. Every
+closure is computed once into bitsets over the structure and vessel tables, so queries
+are a dict lookup and a mask test:
+
+    graph.contains("Spinal Cord", "Phrenic Nerve Nucleus")    # transitive
+    graph.supplying("Left Thalamus")                          # inherited from "Thalamus"
+    graph.resolve("Thalamus", "Contralateral", "Right")       # -> "Left Thalamus"
+
+Names outside the graph are placed with `locate`, which matches the same lower-case
+patterns the standardizers use.
+"""
+
+from typing import NamedTuple, Optional
+
+from .anatomy import CONTRALATERAL, SIDES, SPINAL_CORD, structure_table
+from .catalog import NameTable
+from .matching import PriorityMatcher
+from .vessels import VesselOntology
+
+STRUCTURE = "structure"
+VESSEL = "vessel"
+
+SIDE = "side"
+CONTAINS = "contains"
+SUPPLIED_BY = "supplied_by"
+
+# Structures beyond the standardizer's table: (name, lower-case aliases, container).
+# Listed in matching priority, parts before the structures containing them.
+EXTRA_STRUCTURES = (
+    ("Pontine Gaze Center (PPRF)", ("pontine gaze center", "pprf"), "Pons (Brainstem)"),
+    ("Medial Longitudinal Fasciculus (MLF)", ("medial longitudinal fasciculus",), "Brainstem (General)"),
+    ("Phrenic Nerve Nucleus", ("phrenic nerve nucleus",), SPINAL_CORD),
+    (SPINAL_CORD, ("spinal cord",), None),
+    ("Cerebellar vermis", ("cerebellar vermis",), "Cerebellum"),
+    ("Cerebellar hemisphere", ("cerebellar hemisphere",), "Cerebellum"),
+    ("Cerebellar peduncles", ("cerebellar peduncle",), "Cerebellum"),
+    ("Cerebellum", ("cerebellum",), None),
+)
+
+# (container, part) links between structures already in the graph
+EXTRA_CONTAINS = (
+    ("Medulla (Brainstem)", "Lateral Medulla (Brainstem)"),
+)
+
+# Structure -> the vessels supplying it. Parts and side forms without an entry inherit
+# their container's.
+SUPPLIED_BY_VESSELS = {
+    "Internal Capsule": ("Lenticulostriate arteries", "Anterior Choroidal Artery"),
+    "Basal Ganglia": ("Lenticulostriate arteries",),
+    "Subcortical White Matter": ("Lenticulostriate arteries",),
+    "Thalamus": ("Thalamoperforating arteries", "Posterior Cerebral Artery (PCA)"),
+    "Motor Cortex": ("Middle Cerebral Artery (MCA) - Superior Division", "Anterior Cerebral Artery (ACA)"),
+    "Frontal Lobe": ("Middle Cerebral Artery (MCA) - Superior Division", "Anterior Cerebral Artery (ACA)"),
+    "Parietal Lobe": ("Middle Cerebral Artery (MCA) - Superior Division", "Middle Cerebral Artery (MCA) - Inferior Division"),
+    "Temporal Lobe": ("Middle Cerebral Artery (MCA) - Inferior Division",),
+    "Occipital Lobe": ("Posterior Cerebral Artery (PCA) - Calcarine branch",),
+    "Midbrain (Brainstem)": ("Posterior Cerebral Artery (PCA)", "Basilar Artery"),
+    "Pons (Brainstem)": ("Basilar Artery branches (pontine arteries)", "Anterior Inferior Cerebellar Artery (AICA)"),
+    "Medulla (Brainstem)": ("Vertebral Artery",),
+    "Lateral Medulla (Brainstem)": ("Posterior Inferior Cerebellar Artery (PICA)", "Vertebral Artery"),
+    "Cerebellar vermis": ("Superior Cerebellar Artery (SCA)", "Posterior Inferior Cerebellar Artery (PICA)"),
+    "Cerebellar hemisphere": ("Superior Cerebellar Artery (SCA)", "Anterior Inferior Cerebellar Artery (AICA)",
+                              "Posterior Inferior Cerebellar Artery (PICA)"),
+    "Cerebellar peduncles": ("Anterior Inferior Cerebellar Artery (AICA)", "Superior Cerebellar Artery (SCA)"),
+    SPINAL_CORD: ("Spinal Arteries",),
+}
+
+
+class Node(NamedTuple):
+    name: str
+    kind: str
+    # "Right"/"Left" for a side form
+    side: Optional[str] = None
+
+
+def _closure(children, names):
+    """name -> names reachable through `children`, itself included."""
+    reach = {}
+
+    def visit(name, path):
+        if name not in reach:
+            found = {name}
+            for child in children.get(name, ()):
+                if child not in path:
+                    found |= visit(child, path | {child})
+            reach[name] = found
+        return reach[name]
+
+    for name in names:
+        visit(name, frozenset((name,)))
+    return reach
+
+
+class AnatomyGraph:
+    """Built once per Localizer; every query is answered from precomputed bitsets."""
+
+    def __init__(self, rows=None, extra=EXTRA_STRUCTURES, contains=EXTRA_CONTAINS, supplied_by=SUPPLIED_BY_VESSELS,
+                 ontology=None, sides=SIDES):
+        rows = structure_table() if rows is None else rows
+        self.ontology = ontology if ontology is not None else VesselOntology()
+        self.sides = tuple(sides)
+
+        nodes = {}
+        edges = {SIDE: [], CONTAINS: [], SUPPLIED_BY: []}
+        self._forms = {}  # (generic, side) -> side form
+        for name, structure, specific, _ in rows:
+            side = next((s for s in self.sides if specific and name == f"{s} {structure.name}"), None)
+            nodes.setdefault(name, Node(name, STRUCTURE, side))
+            if specific and name != structure.name:
+                if side is not None:
+                    edges[SIDE].append((structure.name, name))
+                    self._forms[structure.name, side] = name
+                else:
+                    edges[CONTAINS].append((structure.name, name))
+        for name, _, container in extra:
+            nodes.setdefault(name, Node(name, STRUCTURE))
+            if container is not None:
+                edges[CONTAINS].append((container, name))
+        edges[CONTAINS] += contains
+        for name in self.ontology.ids:
+            nodes.setdefault(name, Node(name, VESSEL))
+        for structure, vessels in supplied_by.items():
+            edges[SUPPLIED_BY] += [(structure, vessel) for vessel in vessels]
+        for kind, links in edges.items():
+            target_kind = VESSEL if kind == SUPPLIED_BY else STRUCTURE
+            for source, target in links:
+                if source not in nodes or target not in nodes or nodes[target].kind != target_kind:
+                    raise ValueError(f"{kind} edge {source!r} -> {target!r} names an unknown {target_kind}")
+        self.nodes = nodes
+        self.edges = {kind: tuple(links) for kind, links in edges.items()}
+
+        structures = [name for name, node in nodes.items() if node.kind == STRUCTURE]
+        self.structures = NameTable(structures)
+        self.vessels = NameTable(self.ontology.ids)
+        self._matcher = PriorityMatcher(
+            [(name, aliases) for name, aliases, _ in extra] + [(name, patterns) for name, _, _, patterns in rows]
+        )
+
+        # Containment closure: a side form is part of its structure
+        children, parents = {}, {}
+        for source, target in (*self.edges[SIDE], *self.edges[CONTAINS]):
+            children.setdefault(source, []).append(target)
+            parents.setdefault(target, []).append(source)
+        self._within = {name: self.structures.encode(found) for name, found in _closure(children, structures).items()}
+        self._above = {name: self.structures.encode(found) for name, found in _closure(parents, structures).items()}
+
+        # Supply: a structure's own vessels, else those of its nearest containers that have any;
+        # a region is supplied by whatever supplies any of its parts.
+        direct = {}
+        for structure, vessel in self.edges[SUPPLIED_BY]:
+            direct[structure] = direct.get(structure, 0) | self.vessels.bits[vessel]
+        inherited = {}
+        for name in structures:
+            mask = direct.get(name, 0)
+            frontier = parents.get(name, [])
+            while not mask and frontier:
+                for parent in frontier:
+                    mask |= direct.get(parent, 0)
+                frontier = [grand for parent in frontier for grand in parents.get(parent, ())]
+            inherited[name] = mask
+        self._supply = {}
+        for name in structures:
+            mask = 0
+            for part in self.structures.decode(self._within[name]):
+                mask |= inherited[part]
+            self._supply[name] = mask
+        # Vessel -> structures it (or a branch of it) supplies, with their parts
+        self._supplied = {}
+        for vessel in self.ontology.ids:
+            branches = self.vessels.encode({vessel, *self.ontology.descendants.get(vessel, ())})
+            mask = 0
+            for name in structures:
+                if inherited[name] & branches:
+                    mask |= self._within[name]
+            self._supplied[vessel] = mask
+
+    def locate(self, name):
+        """The graph structure a location name refers to, or None."""
+        node = self.nodes.get(name)
+        if node is not None:
+            return name if node.kind == STRUCTURE else None
+        return self._matcher.match(name)
+
+    def contains(self, container, part):
+        """Whether `part` is `container` or lies within it (through contains and side edges)."""
+        return bool(self._within.get(container, 0) & self.structures.bits.get(part, 0))
+
+    def within(self, container):
+        """Bitset over `structures` of the container and everything in it."""
+        return self._within.get(container, 0)
+
+    def containers(self, part):
+        return self.structures.decode(self._above.get(part, 0))
+
+    def sided(self, name, side):
+        """The Right/Left form of a generic structure (None when it has no side forms)."""
+        return self._forms.get((name, side))
+
+    def resolve(self, name, laterality, side):
+        """Side form of `name` for a lesion Contralateral/Ipsilateral to deficits on `side`.
+
+        Falls back to `name` when the side is unknown or the structure has no side forms.
+        """
+        if side is None:
+            return name
+        if laterality == CONTRALATERAL:
+            side = self.sides[1 - self.sides.index(side)]
+        return self._forms.get((name, side), name)
+
+    def supplying(self, name):
+        """Vessels supplying a structure or any of its parts."""
+        return self.vessels.decode(self._supply.get(name, 0))
+
+    def supplied_by(self, vessel):
+        """Structures supplied by a vessel or one of its branches."""
+        return self.structures.decode(self._supplied.get(vessel, 0))
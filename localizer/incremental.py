@@ -0,0 +1,163 @@
+"""Incremental re-localization for interactive sessions.
+
+A session keeps a LocalizationState: the branch that fired in each rule chain and, for
+every location, vessel, note and syndrome, the set of rules that contributed it. When the
+symptom selection changes, only the chains that mention a changed symptom are
+re-evaluated, the syndromes are only looked up again when a changed symptom appears in
+one, and only the rules that stopped or started firing are retracted or applied.
+
+Supersession is derived from the contributions when the Result is assembled (a generic
+location is hidden while any specific form is contributed, a vessel while any of its
+descendants is), so removing the rule that added "Right Thalamus" brings a generic
+"Thalamus" back if another rule still contributes it. That is the same end state a full
+replay reaches, whatever order the rules ran in.
+"""
+
+import time
+from collections import defaultdict
+
+from .engine import Result
+from .rules import IF_NIHSS
+
+_FIELDS = ("lesion_locations", "affected_vessels", "ambiguity_notes", "vascular_analysis", "infos")
+
+
+class LocalizationState:
+    """Per-session incremental state; create with IncrementalLocalizer.new_state()."""
+
+    def __init__(self, n_chains, knowledge=""):
+        # SHA-256 of the knowledge base the state was built against
+        self.knowledge = knowledge
+        self.selected = frozenset()
+        self.fired = [None] * n_chains
+        # matched syndromes, ranked
+        self.syndromes = ()
+        # field -> item -> names of the fired rules that contributed it
+        self.sources = {field: defaultdict(set) for field in _FIELDS}
+
+    def provenance(self, item):
+        """Names of the fired rules that contributed a location, vessel, note or syndrome."""
+        found = set()
+        for sources in self.sources.values():
+            found |= sources.get(item, set())
+        return found
+
+
+class IncrementalLocalizer:
+    """Wraps a Localizer; `localize(..., state=...)` updates a session's state in place."""
+
+    def __init__(self, localizer):
+        self.localizer = localizer
+        self.rules = localizer.rules
+        self.chain_names = localizer.knowledge.chain_names
+
+        # symptom -> indices of the chains whose branches mention it
+        self.chains_by_symptom = localizer.knowledge.chains_by_symptom
+
+        self.syndromes = localizer.syndromes
+
+        # rule -> canonical contributions per field
+        self.contributions = {}
+        for rule in (*(rule for chain in self.rules for rule in chain), *self.syndromes.ranked):
+            self.contributions[rule.name] = {
+                "lesion_locations": tuple(localizer.standard_lesions[loc].name for loc in rule.lesions),
+                "affected_vessels": tuple(localizer.standard_vessels[v] for v in rule.vessels),
+                "ambiguity_notes": rule.notes,
+                "vascular_analysis": rule.analysis,
+                "infos": rule.info,
+            }
+
+    def __getattr__(self, name):
+        return getattr(self.localizer, name)
+
+    def new_state(self):
+        return LocalizationState(len(self.rules), self.localizer.knowledge.sha256)
+
+    def localize(self, symptoms, chief_complaint="", state=None):
+        if state is None:
+            return self.localizer.localize(symptoms, chief_complaint)
+        self.update(state, symptoms)
+        return self.result(state, chief_complaint)
+
+    def update(self, state, symptoms):
+        """Bring `state` to the new selection, touching only chains of changed symptoms."""
+        selected = frozenset(symptoms)
+        changed = state.selected ^ selected
+        if len(changed) == 1:
+            chains = self.chains_by_symptom.get(next(iter(changed)), ())
+        else:
+            chains = sorted({c for s in changed for c in self.chains_by_symptom.get(s, ())})
+        metrics = self.localizer.metrics
+        timed = metrics.enabled
+        if timed:
+            start = rules_start = time.perf_counter()
+        for c in chains:
+            fired = next((rule for rule in self.rules[c] if rule.matches(selected)), None)
+            previous = state.fired[c]
+            if fired is not previous:
+                if previous is not None:
+                    self._retract(state, previous)
+                if fired is not None:
+                    self._apply(state, fired)
+                state.fired[c] = fired
+            if timed:
+                start = metrics.lap_chain(self.chain_names[c], fired, start)
+        if not self.syndromes.symptoms.isdisjoint(changed):
+            matched = self.syndromes.match(selected)
+            for rule in state.syndromes:
+                if rule not in matched:
+                    self._retract(state, rule)
+            for rule in matched:
+                if rule not in state.syndromes:
+                    self._apply(state, rule)
+            state.syndromes = matched
+            if timed:
+                metrics.lap_syndromes(matched, start)
+        if timed:
+            metrics.lap("rules", rules_start)
+        state.selected = selected
+
+    def _apply(self, state, rule):
+        for field, items in self.contributions[rule.name].items():
+            sources = state.sources[field]
+            for item in items:
+                sources[item].add(rule.name)
+
+    def _retract(self, state, rule):
+        for field, items in self.contributions[rule.name].items():
+            sources = state.sources[field]
+            for item in items:
+                names = sources.get(item)
+                if names is not None:
+                    names.discard(rule.name)
+                    if not names:
+                        del sources[item]
+
+    def result(self, state, chief_complaint=""):
+        """Assemble the Result for the current state."""
+        metrics = self.localizer.metrics
+        timed = metrics.enabled
+        if timed:
+            start = time.perf_counter()
+        use_nihss = self.localizer.use_nihss(state.selected, chief_complaint.strip())
+        if timed:
+            start = metrics.lap("nihss_keywords", start)
+        catalog = self.localizer.catalog
+        sources = state.sources
+        lesions = catalog.locations.encode(sources["lesion_locations"])
+        lesions = catalog.supersede_locations(catalog.lateralize(lesions, self.localizer.hemiparesis_side(state.selected)))
+        vessels = catalog.supersede_vessels(catalog.vessels.encode(sources["affected_vessels"]))
+        notes = catalog.notes.encode(sources["ambiguity_notes"])
+        analysis = catalog.analyses.encode(sources["vascular_analysis"])
+        infos = catalog.infos.encode(sources["infos"])
+
+        fired = [rule for rule in state.fired if rule is not None] + list(state.syndromes)
+        suggest_imaging = any(rule.imaging != IF_NIHSS or use_nihss for rule in fired)
+
+        if timed:
+            start = metrics.lap("assemble", start)
+        additional = catalog.additional(vessels, analysis)
+        if timed:
+            metrics.lap("covered_by", start)
+
+        return Result(catalog, lesions, vessels, notes, analysis, additional, infos, suggest_imaging, use_nihss)
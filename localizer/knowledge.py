@@ -0,0 +1,251 @@
+"""Rule knowledge base: loading, validation, compiled snapshots and hot reload.
+
+The rules and the NIHSS item table live in data/rules.json. Compiling validates the
+file and freezes it into Rule chains plus lookup indexes. The compiled form is pickled
+to a snapshot named after the file's SHA-256, so later starts (and other worker
+processes) load the snapshot instead of recompiling, and a KnowledgeSource only
+re-reads the file when its mtime or size changes and only recompiles when its hash does.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import defaultdict
+from typing import NamedTuple
+
+from .rules import IMAGING, compile_rule, compile_rules
+from .vocab import SYMPTOMS
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "rules.json")
+
+# Bump when the compiled representation changes so old snapshots are ignored.
+SNAPSHOT_FORMAT = 3
+
+_RULE_KEYS = {"name", "when", "any", "none", "lesions", "vessels", "notes", "analysis", "info", "imaging", "comment"}
+_LIST_KEYS = ("when", "any", "none", "lesions", "vessels", "notes", "analysis", "info")
+
+
+class KnowledgeBaseError(ValueError):
+    """The rule file is malformed or refers to unknown symptoms."""
+
+
+class KnowledgeBase(NamedTuple):
+    version: str
+    sha256: str
+    # if/elif rule chains, applied in order
+    chains: tuple
+    chain_names: tuple
+    # combined syndromes in file order; all that match apply
+    syndromes: tuple
+    # (item, allowed scores) in exam order
+    nihss_items: tuple
+    # symptom -> indices of the chains whose rules mention it
+    chains_by_symptom: dict
+    rules_by_name: dict
+
+
+def default_cache_dir():
+    if os.environ.get("LOCALIZER_CACHE_DIR"):
+        return os.environ["LOCALIZER_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "localizer")
+
+
+def _check_strings(where, key, value):
+    if not isinstance(value, list) or not all(isinstance(v, str) and v.strip() for v in value):
+        raise KnowledgeBaseError(f"{where}: '{key}' must be a list of non-empty strings")
+
+
+def _check_list(where, key, value):
+    if not isinstance(value, list):
+        raise KnowledgeBaseError(f"{where}: '{key}' must be a list")
+
+
+def _validate_rule(rule, known, rule_names):
+    if not isinstance(rule, dict):
+        raise KnowledgeBaseError(f"rule {rule!r}: must be an object")
+    where = f"rule {rule.get('name')!r}"
+    unknown_keys = set(rule) - _RULE_KEYS
+    if unknown_keys:
+        raise KnowledgeBaseError(f"{where}: unknown keys {sorted(unknown_keys)}")
+    if not isinstance(rule.get("name"), str) or not rule["name"] or rule["name"] in rule_names:
+        raise KnowledgeBaseError(f"{where}: missing or duplicate name")
+    rule_names.add(rule["name"])
+    if not rule.get("when"):
+        raise KnowledgeBaseError(f"{where}: 'when' must list at least one symptom")
+    for key in _LIST_KEYS:
+        if key in rule:
+            _check_strings(where, key, rule[key])
+    unknown = (set(rule["when"]) | set(rule.get("any", ())) | set(rule.get("none", ()))) - known
+    if unknown:
+        raise KnowledgeBaseError(f"{where}: unknown symptoms {sorted(unknown)}")
+    if set(rule.get("none", ())) & (set(rule["when"]) | set(rule.get("any", ()))):
+        raise KnowledgeBaseError(f"{where}: 'none' overlaps 'when' or 'any'")
+    if rule.get("imaging") not in IMAGING:
+        raise KnowledgeBaseError(f"{where}: 'imaging' must be one of {IMAGING}")
+
+
+def validate(data, symptoms=SYMPTOMS):
+    """Raise KnowledgeBaseError if `data` (the parsed JSON) is not a valid knowledge base."""
+    if not isinstance(data, dict):
+        raise KnowledgeBaseError("top level must be an object")
+    for key in ("version", "chains", "nihss_items"):
+        if key not in data:
+            raise KnowledgeBaseError(f"missing '{key}'")
+    _check_list("knowledge base", "chains", data["chains"])
+    _check_list("knowledge base", "syndromes", data.get("syndromes", []))
+    _check_list("knowledge base", "nihss_items", data["nihss_items"])
+    known = set(symptoms)
+    chain_names = set()
+    rule_names = set()
+    for c, chain in enumerate(data["chains"]):
+        if not isinstance(chain, dict):
+            raise KnowledgeBaseError(f"chain {c}: must be an object")
+        where = f"chain {chain.get('chain', c)!r}"
+        if not isinstance(chain.get("chain"), str) or not chain["chain"]:
+            raise KnowledgeBaseError(f"{where}: 'chain' must be a non-empty name")
+        if chain["chain"] in chain_names:
+            raise KnowledgeBaseError(f"{where}: duplicate chain name")
+        chain_names.add(chain["chain"])
+        if not chain.get("rules"):
+            raise KnowledgeBaseError(f"{where}: no rules")
+        _check_list(where, "rules", chain["rules"])
+        for rule in chain["rules"]:
+            _validate_rule(rule, known, rule_names)
+    for rule in data.get("syndromes", ()):
+        _validate_rule(rule, known, rule_names)
+    for entry in data["nihss_items"]:
+        item = entry.get("item") if isinstance(entry, dict) else None
+        scores = entry.get("scores") if isinstance(entry, dict) else None
+        if (not isinstance(item, str) or not item or not isinstance(scores, list) or not scores
+                or not all(isinstance(s, int) and not isinstance(s, bool) and s >= 0 for s in scores)):
+            raise KnowledgeBaseError(f"NIHSS item {item!r}: needs a name and non-negative integer scores")
+
+
+def compile_knowledge(data, sha256=""):
+    """Validate parsed JSON and build the immutable KnowledgeBase."""
+    validate(data)
+    chains = compile_rules(chain["rules"] for chain in data["chains"])
+    syndromes = tuple(compile_rule(rule) for rule in data.get("syndromes", ()))
+    chains_by_symptom = defaultdict(list)
+    for c, chain in enumerate(chains):
+        for symptom in sorted({s for rule in chain for s in rule.when | rule.any}):
+            chains_by_symptom[symptom].append(c)
+    return KnowledgeBase(
+        version=str(data["version"]),
+        sha256=sha256,
+        chains=chains,
+        chain_names=tuple(chain["chain"] for chain in data["chains"]),
+        syndromes=syndromes,
+        nihss_items=tuple((entry["item"], tuple(entry["scores"])) for entry in data["nihss_items"]),
+        chains_by_symptom={s: tuple(c) for s, c in chains_by_symptom.items()},
+        rules_by_name={rule.name: rule for rule in (*(r for chain in chains for r in chain), *syndromes)},
+    )
+
+
+def _snapshot_path(cache_dir, sha256):
+    return os.path.join(cache_dir, f"rules-{sha256[:16]}.pickle")
+
+
+def _read_snapshot(path, sha256):
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    # TypeError: a snapshot of an older class layout that no longer unpickles
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+        return None
+    if payload.get("format") != SNAPSHOT_FORMAT or payload.get("sha256") != sha256:
+        return None
+    return payload["knowledge"]
+
+
+def _write_snapshot(path, sha256, knowledge):
+    # Best effort: a read-only cache directory only costs a recompile on the next start.
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"format": SNAPSHOT_FORMAT, "sha256": sha256, "knowledge": knowledge}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def load_file(path=DEFAULT_PATH, cache_dir=None, raw=None):
+    """Load a knowledge base from its snapshot, compiling (and snapshotting) on a miss."""
+    if raw is None:
+        with open(path, "rb") as f:
+            raw = f.read()
+    sha256 = hashlib.sha256(raw).hexdigest()
+    cache_dir = cache_dir or default_cache_dir()
+    snapshot = _snapshot_path(cache_dir, sha256)
+    knowledge = _read_snapshot(snapshot, sha256)
+    if knowledge is None:
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except ValueError as e:
+            raise KnowledgeBaseError(f"{path}: {e}") from e
+        knowledge = compile_knowledge(data, sha256)
+        _write_snapshot(snapshot, sha256, knowledge)
+    return knowledge
+
+
+class KnowledgeSource:
+    """A rule file plus its current compiled KnowledgeBase, reloaded when the file changes."""
+
+    def __init__(self, path=DEFAULT_PATH, cache_dir=None):
+        self.path = path
+        self.cache_dir = cache_dir
+        # Why the last reload was rejected, if it was; the previous rules stay in use.
+        self.error = None
+        self._stat = None
+        self._knowledge = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """The KnowledgeBase for the file as it is now; costs one stat() when unchanged.
+
+        A file that is missing, unreadable (e.g. mid-replace) or invalid keeps the
+        previous rules in use, with the reason in `error`; only the first load raises.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            if self._knowledge is None:
+                raise
+            self.error = e
+            return self._knowledge
+        stat = (st.st_mtime_ns, st.st_size)
+        if stat == self._stat:
+            return self._knowledge
+        with self._lock:
+            if stat != self._stat:
+                try:
+                    with open(self.path, "rb") as f:
+                        raw = f.read()
+                    if self._knowledge is None or hashlib.sha256(raw).hexdigest() != self._knowledge.sha256:
+                        self._knowledge = load_file(self.path, self.cache_dir, raw)
+                    self.error = None
+                except (KnowledgeBaseError, OSError) as e:
+                    if self._knowledge is None:
+                        raise
+                    self.error = e
+                    # Not recorded as seen: a read that failed mid-replace is retried next call
+                    if isinstance(e, OSError):
+                        return self._knowledge
+                self._stat = stat
+        return self._knowledge
+
+
+_sources = {}
+
+
+def load_knowledge(path=DEFAULT_PATH):
+    """Current KnowledgeBase for `path`, shared process-wide and hot-reloaded on change."""
+    source = _sources.get(path)
+    if source is None:
+        source = _sources.setdefault(path, KnowledgeSource(path))
+    return source.current()
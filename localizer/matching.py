@@ -0,0 +1,72 @@
+"""Single-pass multi-pattern matching shared by the anatomy and vessel standardizers."""
+
+from collections import deque
+
+
+class PriorityMatcher:
+    """Aho-Corasick automaton that returns the highest-priority value whose pattern occurs.
+
+    `rows` is a sequence of (value, patterns) in priority order; patterns are lower-case
+    substrings. Every trie node stores the best row ending at it or at any of its
+    suffixes, so a scan is a single O(len(text)) walk no matter how many patterns exist.
+    """
+
+    def __init__(self, rows):
+        self.values = tuple(value for value, _ in rows)
+        none = len(self.values)
+
+        self._goto = [{}]
+        self._best = [none]
+        for rank, (_, patterns) in enumerate(rows):
+            for pattern in patterns:
+                node = 0
+                for ch in pattern:
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][ch] = nxt
+                        self._goto.append({})
+                        self._best.append(none)
+                    node = nxt
+                self._best[node] = min(self._best[node], rank)
+
+        # Failure links, folding each suffix's best match (and every match, for find_all) into the node.
+        self._out = [frozenset((rank,)) if rank < none else frozenset() for rank in self._best]
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._best[nxt] = min(self._best[nxt], self._best[self._fail[nxt]])
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def match(self, text, default=None):
+        """Value of the highest-priority pattern found in `text` (case-insensitive)."""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = len(self.values)
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best_at[node] < best:
+                best = best_at[node]
+        return self.values[best] if best < len(self.values) else default
+
+    def find_all(self, text):
+        """Values of every pattern found in `text`, in priority order, from the same single pass."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return [self.values[rank] for rank in sorted(found)]
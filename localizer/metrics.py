@@ -0,0 +1,142 @@
+"""Optional timing instrumentation for the localization pipeline.
+
+A Metrics registry keeps call counts and cumulative wall time per pipeline stage
+(NIHSS keyword scan, rule chains, covered-by filtering, rendering, ...) and per rule
+chain, plus how often each rule fired. It is off unless enabled (LOCALIZER_METRICS=1,
+the sidebar debug toggle or `serve --metrics`). The engine checks `enabled` once per
+call and only then reads the clock, so disabled instrumentation costs a few branches;
+`stage()` hands back a shared no-op context manager when off.
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+_DISABLED = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record_stage(self.name, time.perf_counter() - self.start)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Process-wide counters; safe to record into from several session threads."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}  # stage -> [calls, seconds]
+            self.chains = {}  # chain -> [calls, seconds]
+            self.fired = {}   # rule -> times fired
+
+    def stage(self, name):
+        """`with metrics.stage("render"): ...` times the block when enabled."""
+        return _Timer(self, name) if self.enabled else _DISABLED
+
+    def record_stage(self, name, seconds):
+        with self._lock:
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def lap(self, name, start):
+        """Record a stage that began at perf_counter() `start`; returns now, for the next lap."""
+        now = time.perf_counter()
+        self.record_stage(name, now - start)
+        return now
+
+    def lap_chain(self, chain, fired, start):
+        """Like lap, for one evaluation of a rule chain; `fired` is the Rule that fired, if any."""
+        now = time.perf_counter()
+        with self._lock:
+            entry = self.chains.setdefault(chain, [0, 0.0])
+            entry[0] += 1
+            entry[1] += now - start
+            if fired is not None:
+                self.fired[fired.name] = self.fired.get(fired.name, 0) + 1
+        return now
+
+    def lap_syndromes(self, matched, start):
+        """Like lap_chain, for the syndrome lookup; every matched syndrome counts as fired."""
+        now = time.perf_counter()
+        with self._lock:
+            entry = self.chains.setdefault("syndromes", [0, 0.0])
+            entry[0] += 1
+            entry[1] += now - start
+            for rule in matched:
+                self.fired[rule.name] = self.fired.get(rule.name, 0) + 1
+        return now
+
+    def snapshot(self):
+        """Rows for display: stages and chains by time spent, rules by times fired."""
+        with self._lock:
+            stages = [{"stage": name, "calls": calls, "total_ms": seconds * 1000,
+                       "mean_us": seconds * 1e6 / calls if calls else 0.0}
+                      for name, (calls, seconds) in self.stages.items()]
+            chains = [{"chain": name, "calls": calls, "total_ms": seconds * 1000,
+                       "mean_us": seconds * 1e6 / calls if calls else 0.0}
+                      for name, (calls, seconds) in self.chains.items()]
+            fired = [{"rule": name, "fired": count} for name, count in self.fired.items()]
+        return {
+            "stages": sorted(stages, key=lambda row: -row["total_ms"]),
+            "chains": sorted(chains, key=lambda row: -row["total_ms"]),
+            "rules": sorted(fired, key=lambda row: -row["fired"]),
+        }
+
+    def prometheus(self, cache=None):
+        """Counters in the Prometheus text exposition format (optionally with a ResultCache's stats)."""
+        with self._lock:
+            stages = sorted(self.stages.items())
+            chains = sorted(self.chains.items())
+            fired = sorted(self.fired.items())
+        lines = []
+
+        def family(name, help_text, label, rows):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f'{name}{{{label}="{_escape(key)}"}} {value}' for key, value in rows)
+
+        family("localizer_stage_calls_total", "Calls per pipeline stage.", "stage",
+               [(name, calls) for name, (calls, _) in stages])
+        family("localizer_stage_seconds_total", "Wall time spent per pipeline stage.", "stage",
+               [(name, repr(seconds)) for name, (_, seconds) in stages])
+        family("localizer_chain_calls_total", "Evaluations per rule chain.", "chain",
+               [(name, calls) for name, (calls, _) in chains])
+        family("localizer_chain_seconds_total", "Wall time spent per rule chain.", "chain",
+               [(name, repr(seconds)) for name, (_, seconds) in chains])
+        family("localizer_rule_fired_total", "Times each rule fired.", "rule", fired)
+        if cache is not None:
+            stats = cache.stats()
+            for name, kind, help_text, value in (
+                ("localizer_cache_hits_total", "counter", "Result cache lookups answered from the cache.", stats["hits"]),
+                ("localizer_cache_misses_total", "counter", "Result cache lookups that had to localize.", stats["misses"]),
+                ("localizer_cache_evictions_total", "counter", "Results evicted from the cache.", stats["evictions"]),
+                ("localizer_cache_entries", "gauge", "Results currently held in the cache.", stats["size"]),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Metrics(enabled=os.environ.get("LOCALIZER_METRICS") == "1")
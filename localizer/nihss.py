@@ -0,0 +1,25 @@
+"""NIHSS scoring against the item table from the knowledge base."""
+
+from typing import NamedTuple
+
+
+class NihssScore(NamedTuple):
+    total: int
+    # items with no entered score
+    missing: tuple
+    # items that are unknown or whose score is not allowed for them
+    invalid: tuple
+
+
+def score_nihss(entered_scores, nihss_items):
+    """Total the entered {item: score} against `nihss_items` ((item, allowed scores) pairs)."""
+    allowed = dict(nihss_items)
+    total = 0
+    invalid = []
+    for item, value in entered_scores.items():
+        if item not in allowed or isinstance(value, bool) or not isinstance(value, int) or value not in allowed[item]:
+            invalid.append(item)
+        else:
+            total += value
+    missing = tuple(item for item, _ in nihss_items if item not in entered_scores)
+    return NihssScore(total, missing, tuple(invalid))
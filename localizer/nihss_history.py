@@ -0,0 +1,182 @@
+"""Serial NIHSS exams per patient (baseline, post-tPA, 24 h, ...).
+
+A patient's exams are held column-wise: one int8 array per NIHSS item (MISSING where
+the item was not scored), a float array of Unix times and an int16 array of totals.
+Appending an exam is one array append per column, a patient costs about two
+kilobytes plus ~25 bytes per exam, and deltas and trends are numpy operations over
+the columns rather than walks over records.
+
+    history = NihssHistory(knowledge.nihss_items)
+    series = history.record("MRN-123", entered_scores, label="Baseline")
+    series.trend()
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+from .nihss import score_nihss
+
+MISSING = -1
+
+
+class Exam(NamedTuple):
+    time: float
+    label: str
+    total: int
+    # {item: score} for the items that were scored
+    scores: dict
+
+
+class Trend(NamedTuple):
+    exams: int
+    baseline: int
+    latest: int
+    # latest - baseline; negative is improvement
+    change: int
+    # Least-squares slope of the total, points per hour (0.0 with fewer than two exam times)
+    per_hour: float
+    # Items scored at both the baseline and the latest exam, by direction of change
+    improved: tuple
+    worsened: tuple
+
+
+class NihssSeries:
+    """One patient's exams; appends and reads are serialized by the series' lock."""
+
+    __slots__ = ("nihss_items", "items", "times", "totals", "labels", "_columns", "_lock")
+
+    def __init__(self, nihss_items):
+        self.nihss_items = nihss_items
+        self.items = tuple(item for item, _ in nihss_items)
+        self.times = array("d")
+        self.totals = array("h")
+        self.labels = []
+        self._columns = tuple(array("b") for _ in self.items)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.times)
+
+    def append(self, entered_scores, when=None, label=""):
+        """Add an exam scored as {item: score}; unscored items are kept as MISSING."""
+        scored = score_nihss(entered_scores, self.nihss_items)
+        if scored.invalid:
+            raise ValueError("invalid NIHSS scores for: " + ", ".join(scored.invalid))
+        with self._lock:
+            for item, column in zip(self.items, self._columns):
+                column.append(entered_scores.get(item, MISSING))
+            self.totals.append(scored.total)
+            self.labels.append(label)
+            self.times.append(time.time() if when is None else when)
+        return scored.total
+
+    def exams(self, start=0):
+        """Exams from index `start` on, oldest first."""
+        with self._lock:
+            return [
+                Exam(self.times[i], self.labels[i], self.totals[i],
+                     {item: column[i] for item, column in zip(self.items, self._columns) if column[i] != MISSING})
+                for i in range(start, len(self.times))
+            ]
+
+    def _arrays(self):
+        # Byte copies taken under the lock: no numpy view keeps exporting a column's buffer,
+        # which would make the next append fail.
+        with self._lock:
+            times, totals, columns = self.times.tobytes(), self.totals.tobytes(), b"".join(self._columns)
+        scores = np.frombuffer(columns, dtype=np.int8).reshape(len(self.items), -1).T
+        return (np.frombuffer(times, dtype=np.float64), np.frombuffer(totals, dtype=np.int16).astype(np.int32),
+                scores)
+
+    def matrix(self):
+        """(exams, items) int8 scores, MISSING where an item was not scored (read-only)."""
+        return self._arrays()[2]
+
+    def deltas(self):
+        """(change from the previous exam, change from the baseline) of the total, per exam."""
+        _, totals, _ = self._arrays()
+        if not len(totals):
+            return totals, totals
+        steps = np.zeros_like(totals)
+        steps[1:] = totals[1:] - totals[:-1]
+        return steps, totals - totals[0]
+
+    def item_deltas(self, start=0, end=-1):
+        """Per-item change from exam `start` to exam `end`; 0 where either was not scored."""
+        scores = self._arrays()[2].astype(np.int16)
+        if not len(scores):
+            return np.zeros(len(self.items), dtype=np.int16)
+        before, after = scores[start], scores[end]
+        return np.where((before != MISSING) & (after != MISSING), after - before, 0)
+
+    def trend(self):
+        times, totals, scores = self._arrays()
+        if not len(totals):
+            return Trend(0, 0, 0, 0, 0.0, (), ())
+        hours = (times - times[0]) / 3600
+        spread = hours - hours.mean()
+        denominator = (spread * spread).sum()
+        per_hour = float((spread * (totals - totals.mean())).sum() / denominator) if denominator else 0.0
+        first, last = scores[0].astype(np.int16), scores[-1].astype(np.int16)
+        scored = (first != MISSING) & (last != MISSING)
+        change = last - first
+        return Trend(
+            exams=len(totals),
+            baseline=int(totals[0]),
+            latest=int(totals[-1]),
+            change=int(totals[-1] - totals[0]),
+            per_hour=per_hour,
+            improved=tuple(self.items[j] for j in np.flatnonzero(scored & (change < 0))),
+            worsened=tuple(self.items[j] for j in np.flatnonzero(scored & (change > 0))),
+        )
+
+
+class NihssHistory:
+    """Series per patient id, shared between sessions; the least recently examined are dropped past max_patients."""
+
+    def __init__(self, nihss_items, max_patients=1000):
+        self.nihss_items = tuple(nihss_items)
+        self.max_patients = max_patients
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._series)
+
+    def __contains__(self, patient):
+        return patient in self._series
+
+    def get(self, patient):
+        return self._series.get(patient)
+
+    def patients(self):
+        """Patient ids, most recently examined first."""
+        with self._lock:
+            return list(reversed(self._series))
+
+    def record(self, patient, entered_scores, when=None, label=""):
+        """Append an exam to the patient's series (created on first use) and return the series."""
+        with self._lock:
+            series = self._series.get(patient)
+            if series is None:
+                series = self._series[patient] = NihssSeries(self.nihss_items)
+            self._series.move_to_end(patient)
+            while len(self._series) > self.max_patients:
+                self._series.popitem(last=False)
+        try:
+            series.append(entered_scores, when, label)
+        except ValueError:
+            # Don't keep a patient whose only exam was rejected
+            if not len(series):
+                self.discharge(patient)
+            raise
+        return series
+
+    def discharge(self, patient):
+        with self._lock:
+            self._series.pop(patient, None)
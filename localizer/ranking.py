@@ -0,0 +1,173 @@
+"""Likelihood ranking of lesion locations and vessels from sparse symptom weights.
+
+The rule table is folded once into two sparse matrices, symptom x location and symptom
+x vessel. A rule spreads one unit of weight from each symptom it requires over the
+locations (vessels) it names, so a symptom pointing at a single structure counts more
+than one listing five, and a structure several selected symptoms agree on collects
+weight from each of them. A generic location's weight is also credited to its specific
+forms, and a vessel's to its descendants, since those are what it is shown as.
+
+Scoring a case is then one sparse vector-matrix product (only the rows of the selected
+symptoms are touched), and a batch is one sparse matrix-matrix product; no rule is
+looked at per case. The scores of the locations and vessels in the Result are
+normalized into likelihoods that sum to one.
+
+Columns follow the Localizer's catalog tables, so column j is bit j of a Result mask.
+"""
+
+from collections import defaultdict
+from typing import NamedTuple
+
+import numpy as np
+
+
+class SparseMatrix:
+    """Minimal CSR matrix: just the products the ranker needs."""
+
+    def __init__(self, entries, shape):
+        """`entries` maps (row, col) to a weight."""
+        self.shape = shape
+        keys = sorted(entries)
+        self.indices = np.array([col for _, col in keys], dtype=np.int64)
+        self.data = np.array([entries[key] for key in keys], dtype=np.float64)
+        counts = np.bincount(np.array([row for row, _ in keys], dtype=np.int64), minlength=shape[0])
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def _gather(self, rows):
+        """Positions in indices/data of the entries of `rows`, and how many each row has."""
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return offsets + np.arange(counts.sum()), counts
+
+    def vecmat(self, x):
+        """x @ self for a dense vector over the rows."""
+        rows = np.flatnonzero(x)
+        positions, counts = self._gather(rows)
+        weights = self.data[positions] * np.repeat(x[rows], counts)
+        return np.bincount(self.indices[positions], weights=weights, minlength=self.shape[1])
+
+    def matmat(self, X):
+        """X @ self for a dense (n, rows) matrix."""
+        n = X.shape[0]
+        cases, rows = np.nonzero(X)
+        positions, counts = self._gather(rows)
+        cells = np.repeat(cases, counts) * self.shape[1] + self.indices[positions]
+        weights = self.data[positions] * np.repeat(X[cases, rows], counts)
+        return np.bincount(cells, weights=weights, minlength=n * self.shape[1]).reshape(n, self.shape[1])
+
+
+class Ranking(NamedTuple):
+    # (location, likelihood), most likely first
+    locations: tuple
+    # (vessel, likelihood), most likely first
+    vessels: tuple
+
+
+def likelihoods(scores, present):
+    """Scores of the present columns normalized per row (or for one vector); others are 0."""
+    masked = np.where(present, scores, 0.0)
+    total = masked.sum(axis=-1, keepdims=True)
+    return np.divide(masked, total, out=np.zeros_like(masked), where=total > 0)
+
+
+def _positions(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Ranker:
+    """Symptom-weight matrices for a Localizer's rule table."""
+
+    def __init__(self, localizer):
+        self.catalog = catalog = localizer.catalog
+        self.symptoms = tuple(localizer.symptoms)
+        self.index = {s: i for i, s in enumerate(self.symptoms)}
+
+        lesion_weights = defaultdict(float)
+        vessel_weights = defaultdict(float)
+        rules = [*(rule for chain in localizer.rules for rule in chain), *localizer.syndromes.ranked]
+        for rule in rules:
+            bits = localizer.rule_bits[rule.name]
+            rows = [self.index[s] for s in rule.when | rule.any if s in self.index]
+            for weights, mask in ((lesion_weights, bits.lesions), (vessel_weights, bits.vessels)):
+                cols = list(_positions(mask))
+                for row in rows:
+                    for col in cols:
+                        weights[row, col] += 1.0 / len(cols)
+
+        # Credit generic locations to their specific forms, and vessels to their descendants
+        for weights, parents in ((lesion_weights, catalog.location_generics), (vessel_weights, catalog.vessel_parents)):
+            below = {bit.bit_length() - 1: list(_positions(forms)) for bit, forms in parents}
+            for (row, col), weight in list(weights.items()):
+                for form in below.get(col, ()):
+                    weights[row, form] += weight
+
+        # Relative locations ("Contralateral Thalamus") are shown as what they resolve to
+        resolves = defaultdict(int)
+        for pairs in catalog.lateral.values():
+            for relative, target in pairs:
+                resolves[relative.bit_length() - 1] |= target
+        for (row, col), weight in list(lesion_weights.items()):
+            for target in _positions(resolves.get(col, 0)):
+                lesion_weights[row, target] += weight
+
+        self.locations = SparseMatrix(lesion_weights, (len(self.symptoms), len(catalog.locations)))
+        self.vessels = SparseMatrix(vessel_weights, (len(self.symptoms), len(catalog.vessels)))
+
+    def vector(self, symptoms):
+        x = np.zeros(len(self.symptoms))
+        for s in symptoms:
+            i = self.index.get(s)
+            if i is not None:
+                x[i] = 1.0
+        return x
+
+    def indicators(self, masks):
+        """(n, symptoms) 0/1 matrix from SymptomCodec masks (same symptom order)."""
+        masks = np.asarray(masks, dtype=np.uint64)[:, None]
+        shifts = np.arange(len(self.symptoms), dtype=np.uint64)
+        return ((masks >> shifts) & np.uint64(1)).astype(np.float64)
+
+    def scores(self, symptoms):
+        """(location scores, vessel scores) over the catalog tables for one case."""
+        x = self.vector(symptoms)
+        return self.locations.vecmat(x), self.vessels.vecmat(x)
+
+    def scores_many(self, masks):
+        """(location scores, vessel scores) matrices for a batch of symptom masks."""
+        X = self.indicators(masks)
+        return self.locations.matmat(X), self.vessels.matmat(X)
+
+    def rank(self, result, symptoms):
+        """Ranking of the result's locations and vessels given the selected symptoms."""
+        if not (result.lesion_bits or result.vessel_bits):
+            return Ranking((), ())
+        location_scores, vessel_scores = self.scores(symptoms)
+        return Ranking(
+            self._ranked(self.catalog.locations, location_scores, result.lesion_bits),
+            self._ranked(self.catalog.vessels, vessel_scores, result.vessel_bits),
+        )
+
+    def rank_many(self, masks, bulk):
+        """Likelihood matrices (locations, vessels) for a BulkResult scored from `masks`."""
+        location_scores, vessel_scores = self.scores_many(masks)
+        return (likelihoods(location_scores, bulk.lesion_locations),
+                likelihoods(vessel_scores, bulk.affected_vessels))
+
+    @staticmethod
+    def _ranked(table, scores, mask):
+        cols = list(_positions(mask))
+        if not cols:
+            return ()
+        values = scores[cols]
+        total = values.sum()
+        shares = (values / total).tolist() if total else [1.0 / len(cols)] * len(cols)
+        ranked = sorted(zip(cols, shares), key=lambda item: (-item[1], table.names[item[0]]))
+        return tuple((table.names[col], p) for col, p in ranked)
@@ -0,0 +1,133 @@
+"""Rendering of a localization Result into Streamlit blocks.
+
+Renderers return (kind, body) pairs where `kind` names the Streamlit call (markdown,
+info, header, ...), so the layout can be cached and tested without Streamlit. Results
+are immutable and hashable, which makes them their own cache key.
+
+`render_detailed` emits one element per location, note and vessel. `render_compact`
+builds each section (Considers, Considerations, Territory, Next Steps) into a single
+payload, which cuts the number of delta messages the browser receives per rerun.
+
+Both take an optional Ranking (see ranking.py): locations and vessels are then listed
+most likely first with their likelihood, instead of alphabetically.
+"""
+
+from functools import lru_cache
+
+NO_LOCATIONS = "No specific lesion locations identified from selected symptoms, but vascular involvement may be suggested below."
+NO_TERRITORY = "No specific arterial territory analysis available for selected symptoms."
+IMAGING = "Given the symptoms and potential vascular involvement, **imaging (CT or MRI scan of the brain)** is highly recommended to confirm the lesion location and etiology."
+SPINE_IMAGING = "If spinal cord involvement is suspected (e.g. dissociated sensory loss), **MRI of the spine** may also be indicated."
+CONSULT = "Consult with a neurologist for definitive diagnosis and management."
+NOTHING_FOUND = "No specific lesion or vascular territory suggested. Please refine symptom selection."
+VAGUE = "If symptoms are vague or non-localizing, consultation is recommended for further evaluation."
+
+
+def _spinal(result):
+    return bool(result.lesion_bits & result.catalog.spinal)
+
+
+def _locations(result, ranking):
+    if ranking is None:
+        return sorted(result.lesion_locations)
+    return [f"{name} ({p:.0%})" for name, p in ranking.locations]
+
+
+def _vessels(vessels, ranking):
+    if ranking is None:
+        return sorted(vessels)
+    return [f"{name} ({p:.0%})" for name, p in ranking.vessels if name in vessels]
+
+
+@lru_cache(maxsize=1024)
+def render_detailed(result, chief_complaint_entered, ranking=None):
+    blocks = [("info", info) for info in result.infos]
+
+    if not (result.lesion_locations or result.affected_vessels):
+        blocks.append(("warning", NOTHING_FOUND))
+        if chief_complaint_entered:
+            blocks.append(("info", VAGUE))
+        return tuple(blocks)
+
+    # 1. Likely Lesion Locations
+    blocks.append(("header", "Considers"))
+    if result.lesion_locations:
+        blocks += [("markdown", f"- {loc}") for loc in _locations(result, ranking)]
+    else:
+        blocks.append(("info", NO_LOCATIONS))
+
+    if result.ambiguity_notes:
+        blocks.append(("subheader", "Considerations/Ambiguities:"))
+        blocks += [("info", f"- {note}") for note in sorted(result.ambiguity_notes)]
+
+    # 2. Affected Vascular Territory Analysis
+    blocks.append(("header", "Territory"))
+    if result.vascular_analysis:
+        blocks.append(("subheader", "Most Likely Affected Arterial Supply:"))
+        blocks += [("markdown", f"- **{syndrome}**") for syndrome in result.ranked_analysis]
+        if result.additional_vessels:
+            blocks.append(("markdown", "---"))
+            blocks.append(("info", "Additional potentially affected vessels based on symptoms:"))
+            blocks += [("markdown", f"- {vessel}") for vessel in _vessels(result.additional_vessels, ranking)]
+    elif result.affected_vessels:
+        # If no specific vascular syndrome matched, just display all identified affected_vessels
+        blocks.append(("subheader", "Potentially Affected Arterial Supply based on symptoms:"))
+        blocks += [("markdown", f"- **{vessel}**") for vessel in _vessels(result.affected_vessels, ranking)]
+    else:
+        blocks.append(("info", NO_TERRITORY))
+
+    # 3. Next Steps (Imaging Recommendation)
+    if result.suggest_imaging or result.use_nihss:
+        blocks.append(("subheader", "Next Steps:"))
+        blocks.append(("success", IMAGING))
+        if _spinal(result):
+            blocks.append(("success", SPINE_IMAGING))
+        blocks.append(("info", CONSULT))
+
+    return tuple(blocks)
+
+
+def _bullets(items, bold=False, ranked=False):
+    fmt = "- **{}**" if bold else "- {}"
+    return "\n".join(fmt.format(item) for item in (items if ranked else sorted(items)))
+
+
+@lru_cache(maxsize=1024)
+def render_compact(result, chief_complaint_entered, ranking=None):
+    blocks = []
+    if result.infos:
+        blocks.append(("info", "\n\n".join(result.infos)))
+
+    if not (result.lesion_locations or result.affected_vessels):
+        body = NOTHING_FOUND
+        if chief_complaint_entered:
+            body += "\n\n" + VAGUE
+        blocks.append(("warning", body))
+        return tuple(blocks)
+
+    considers = "## Considers\n\n"
+    considers += _bullets(_locations(result, ranking), ranked=True) if result.lesion_locations else f"> {NO_LOCATIONS}"
+    blocks.append(("markdown", considers))
+
+    if result.ambiguity_notes:
+        blocks.append(("info", "#### Considerations/Ambiguities:\n\n" + _bullets(result.ambiguity_notes)))
+
+    territory = "## Territory\n\n"
+    if result.vascular_analysis:
+        territory += "### Most Likely Affected Arterial Supply:\n\n" + _bullets(result.ranked_analysis, bold=True, ranked=True)
+        if result.additional_vessels:
+            territory += "\n\n---\n\n> Additional potentially affected vessels based on symptoms:\n\n" + _bullets(_vessels(result.additional_vessels, ranking), ranked=True)
+    elif result.affected_vessels:
+        territory += "### Potentially Affected Arterial Supply based on symptoms:\n\n" + _bullets(_vessels(result.affected_vessels, ranking), bold=True, ranked=True)
+    else:
+        territory += f"> {NO_TERRITORY}"
+    blocks.append(("markdown", territory))
+
+    if result.suggest_imaging or result.use_nihss:
+        steps = [IMAGING]
+        if _spinal(result):
+            steps.append(SPINE_IMAGING)
+        steps.append(CONSULT)
+        blocks.append(("success", "#### Next Steps:\n\n" + "\n\n".join(steps)))
+
+    return tuple(blocks)
@@ -0,0 +1,255 @@
+"""Case reports for handoff: a self-contained HTML page (or PDF) of one case.
+
+The report carries the presentation, the same Considers / Territory / Next Steps
+sections as the app (built from render_detailed) and the NIHSS item scores. Reports are
+stored on disk under a hash of everything they show, so the same case exported again
+(another clinician at handoff, a re-download) is read back instead of re-rendered:
+
+    cache = ReportCache()
+    key = report_key(symptoms, chief_complaint, result, entered_scores)
+    html = cache.get_or_render(key, "html", lambda: render_html(symptoms, chief_complaint, result, ...))
+
+PDF output needs WeasyPrint, which is optional; `pdf_available()` says whether it is
+installed.
+"""
+
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from .knowledge import default_cache_dir
+from .nihss import score_nihss
+from .render import render_detailed
+
+# Bump when the template changes, so cached reports in the old layout are not served
+REPORT_FORMAT = 1
+FORMATS = ("html", "pdf")
+
+_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; max-width: 46rem; margin: 2rem auto;
+       padding: 0 1rem; color: #222; line-height: 1.45; }
+h1 { font-size: 1.5rem; margin-bottom: 0.2rem; }
+h2 { font-size: 1.2rem; border-bottom: 1px solid #ccc; margin-top: 1.6rem; }
+h3 { font-size: 1rem; }
+.meta { color: #777; font-size: 0.8rem; }
+.info, .warning, .success { padding: 0.5rem 0.8rem; border-radius: 4px; margin: 0.5rem 0; }
+.info { background: #e8f1fb; } .warning { background: #fdf5e1; } .success { background: #e6f4ea; }
+table { border-collapse: collapse; width: 100%; } td, th { border-bottom: 1px solid #ddd; padding: 0.25rem 0.4rem; text-align: left; }
+td.score, th.score { text-align: right; }
+"""
+
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def report_key(symptoms, chief_complaint, result, entered_scores=None, ranking=None, knowledge_version=""):
+    """Content hash of a case report: the same key means the same report."""
+    case = {
+        "format": REPORT_FORMAT,
+        "knowledge": knowledge_version,
+        "symptoms": sorted(set(symptoms)),
+        "chief_complaint": chief_complaint.strip(),
+        "result": result.to_dict(),
+        "nihss": sorted((entered_scores or {}).items()),
+        "ranking": ranking._asdict() if ranking is not None else None,
+    }
+    return hashlib.sha256(json.dumps(case, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _inline(text):
+    return _BOLD.sub(r"<strong>\1</strong>", html.escape(text))
+
+
+def _sections(blocks):
+    """render_detailed blocks as HTML, consecutive bullets in one list."""
+    parts = []
+    bullets = []
+    for kind, body in blocks:
+        if kind == "markdown" and body.startswith("- "):
+            bullets.append(f"<li>{_inline(body[2:])}</li>")
+            continue
+        if bullets:
+            parts.append("<ul>" + "".join(bullets) + "</ul>")
+            bullets = []
+        if kind == "header":
+            parts.append(f"<h2>{_inline(body)}</h2>")
+        elif kind == "subheader":
+            parts.append(f"<h3>{_inline(body)}</h3>")
+        elif kind == "markdown":
+            parts.append("<hr>" if body == "---" else f"<p>{_inline(body)}</p>")
+        else:
+            parts.append(f'<div class="{kind}">{_inline(body.removeprefix("- "))}</div>')
+    if bullets:
+        parts.append("<ul>" + "".join(bullets) + "</ul>")
+    return parts
+
+
+def render_html(symptoms, chief_complaint, result, entered_scores=None, nihss_items=(), ranking=None,
+                knowledge_version=""):
+    """The report as one HTML document with inline styles and no external resources."""
+    chief_complaint = chief_complaint.strip()
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8"><title>Stroke localization report</title>',
+        f"<style>{_STYLE}</style></head><body>",
+        "<h1>Stroke localization report</h1>",
+    ]
+    if knowledge_version:
+        parts.append(f'<p class="meta">Rules version {html.escape(knowledge_version)}</p>')
+    parts.append("<h2>Presentation</h2>")
+    parts.append(f"<p><strong>Chief complaint:</strong> {html.escape(chief_complaint) or '&mdash;'}</p>")
+    if symptoms:
+        parts.append("<ul>" + "".join(f"<li>{html.escape(s)}</li>" for s in sorted(set(symptoms))) + "</ul>")
+    else:
+        parts.append("<p>No symptoms selected.</p>")
+
+    parts += _sections(render_detailed(result, bool(chief_complaint), ranking))
+
+    if entered_scores:
+        nihss = score_nihss(entered_scores, nihss_items)
+        parts.append(f"<h2>NIHSS: {nihss.total}</h2>")
+        rows = "".join(
+            f'<tr><td>{html.escape(item)}</td><td class="score">{entered_scores[item]}</td></tr>'
+            for item, _ in nihss_items if item in entered_scores
+        )
+        parts.append(f'<table><tr><th>Item</th><th class="score">Score</th></tr>{rows}</table>')
+        if nihss.missing:
+            parts.append(f'<div class="warning">Missing data for: {html.escape(", ".join(nihss.missing))}</div>')
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def pdf_available():
+    return importlib.util.find_spec("weasyprint") is not None
+
+
+def render_pdf(document):
+    """PDF from a report rendered by render_html; needs WeasyPrint."""
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        raise RuntimeError("PDF reports need WeasyPrint (pip install weasyprint)") from None
+    return HTML(string=document.decode("utf-8")).write_pdf()
+
+
+class ReportCache:
+    """Reports on disk as <key>.<format>; past max_bytes the least recently used are removed.
+
+    Recency is the file's modification time, refreshed on every hit, so it survives
+    restarts and is shared by processes using the same directory (each process keeps
+    its own running total, so the bound is per process).
+    """
+
+    def __init__(self, directory=None, max_bytes=64 * 2**20):
+        self.directory = directory or os.path.join(default_cache_dir(), "reports")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()  # file name -> size, least recently used first
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(FORMATS):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._sizes[name] = size
+        self.size = sum(self._sizes.values())
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, key, fmt):
+        name = f"{key}.{fmt}"
+        path = self._path(name)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.size -= self._sizes.pop(name, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            if name not in self._sizes:
+                self._sizes[name] = len(data)
+                self.size += len(data)
+            self._sizes.move_to_end(name)
+            self.hits += 1
+        return data
+
+    def put(self, key, fmt, data):
+        name = f"{key}.{fmt}"
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self.size += len(data) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(data)
+            # The report just written is kept even if it alone is over the bound
+            while self.size > self.max_bytes and len(self._sizes) > 1:
+                oldest, size = self._sizes.popitem(last=False)
+                self.size -= size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(oldest))
+                except FileNotFoundError:
+                    pass
+
+    def get_or_render(self, key, fmt, render):
+        data = self.get(key, fmt)
+        if data is None:
+            # Rendered outside the lock; two sessions racing on the same key both render it.
+            data = render()
+            self.put(key, fmt, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            for name in self._sizes:
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+            self._sizes.clear()
+            self.size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "files": len(self._sizes),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def export_report(cache, fmt, symptoms, chief_complaint, result, entered_scores=None, nihss_items=(), ranking=None,
+                  knowledge_version=""):
+    """The case's report in `fmt` ("html" or "pdf"), from the cache when it was exported before."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown report format {fmt!r}")
+    key = report_key(symptoms, chief_complaint, result, entered_scores, ranking, knowledge_version)
+
+    def html_report():
+        return render_html(symptoms, chief_complaint, result, entered_scores, nihss_items, ranking, knowledge_version)
+
+    if fmt == "html":
+        return cache.get_or_render(key, "html", html_report)
+    # A PDF is printed from the HTML report, which may be cached already
+    return cache.get_or_render(key, "pdf", lambda: render_pdf(cache.get_or_render(key, "html", html_report)))
@@ -0,0 +1,159 @@
+"""Reverse lookup: a lesion site or vessel -> the symptoms and syndromes that point to it.
+
+The index is inverted once from the compiled rule chains and syndromes. Every canonical
+location and vessel gets the rules that name it, and some related names inherit those
+rules:
+- a specific location (e.g. "Left Internal Capsule") inherits the rules naming its
+  generic, and the generic inherits the rules naming any specific form;
+- a relative location ("Contralateral Thalamus") counts for the generic and both side
+  forms it can resolve to;
+- a vessel inherits the rules naming its descendants;
+- a syndrome counts for every vessel its analysis accounts for.
+
+Entries are stored under lower-case keys for the name and for the abbreviation in its
+parentheses ("pica"), merged where names share a key, so a query is a dict lookup
+followed by copying out the answer: O(result size).
+"""
+
+from collections import defaultdict
+from typing import NamedTuple
+
+
+class Contribution(NamedTuple):
+    rule: str
+    syndrome: bool
+    # Symptoms the rule requires, any one of which it needs, and must be absent
+    when: tuple
+    any: tuple
+    none: tuple
+    # The syndrome description(s), for syndromes
+    analysis: tuple
+    # The name the rule contributes, when it is a related one rather than the one asked for
+    via: str
+
+
+class ReverseLookup(NamedTuple):
+    names: tuple
+    # Every symptom some contributing rule looks at (not `none`), in vocabulary order
+    symptoms: tuple
+    rules: tuple
+    # Most specific first
+    syndromes: tuple
+
+    def to_dict(self):
+        return {
+            "names": list(self.names),
+            "symptoms": list(self.symptoms),
+            "rules": [c._asdict() for c in self.rules],
+            "syndromes": [c._asdict() for c in self.syndromes],
+        }
+
+
+EMPTY = ReverseLookup((), (), (), ())
+
+
+def _keys(name):
+    key = name.lower()
+    yield key
+    if key.endswith(")") and "(" in key:
+        yield key[key.rindex("(") + 1:-1]
+
+
+class ReverseIndex:
+    """Built once per Localizer; `locations(name)` and `vessels(name)` answer reverse queries."""
+
+    def __init__(self, localizer):
+        self.anatomy = localizer.anatomy
+        self.ontology = localizer.vessels
+        catalog = localizer.catalog
+        order = {s: i for i, s in enumerate(localizer.symptoms)}
+        rank = {rule.name: i for i, rule in enumerate(localizer.syndromes.ranked)}
+
+        def sort_symptoms(symptoms):
+            return tuple(sorted(symptoms, key=lambda s: (order.get(s, len(order)), s)))
+
+        location_rules = defaultdict(list)  # name -> [(rule, via)]
+        vessel_rules = defaultdict(list)
+        rules = [*(rule for chain in localizer.rules for rule in chain), *localizer.syndromes.ranked]
+        for rule in rules:
+            bits = localizer.rule_bits[rule.name]
+            for name in catalog.locations.decode(bits.lesions):
+                location_rules[name].append((rule, name))
+            for name in catalog.vessels.decode(bits.vessels):
+                vessel_rules[name].append((rule, name))
+            for analysis in catalog.analyses.decode(bits.analysis):
+                covered = catalog.analysis_covers[catalog.analyses.bits[analysis]]
+                for name in catalog.vessels.decode(covered):
+                    vessel_rules[name].append((rule, analysis))
+
+        # Related names inherit each other's rules
+        related = defaultdict(set)
+        resolved = set()
+        for location in localizer.standard_lesions.values():
+            structure = location.structure
+            if structure is None or location.name not in location_rules:
+                continue
+            if location.laterality:
+                # A relative location counts for whatever it can resolve to
+                related[structure.name].add(location.name)
+                for form in structure.forms:
+                    related[form] |= {location.name, structure.name}
+                resolved.update(structure.forms, (structure.name,))
+            elif location.specific:
+                related[location.name].add(structure.name)
+                related[structure.name].add(location.name)
+            else:
+                related[location.name] |= structure.forms
+        location_rules = {
+            name: [*location_rules.get(name, ()),
+                   *(entry for other in sorted(related[name]) for entry in location_rules.get(other, ()))]
+            for name in (*location_rules, *sorted(resolved.difference(location_rules)))
+        }
+        vessel_rules = {
+            name: [*direct, *(entry for below in sorted(self.ontology.descendants.get(name, ()))
+                              for entry in vessel_rules.get(below, ()))]
+            for name, direct in vessel_rules.items()
+        }
+
+        def build(by_name):
+            merged = defaultdict(list)
+            for name, entries in by_name.items():
+                for key in _keys(name):
+                    merged[key].append((name, entries))
+            index = {}
+            for key, named in merged.items():
+                seen = {}
+                for name, entries in named:
+                    for rule, via in entries:
+                        if rule.name not in seen:
+                            seen[rule.name] = Contribution(
+                                rule.name, rule.name in rank, sort_symptoms(rule.when), sort_symptoms(rule.any),
+                                sort_symptoms(rule.none), rule.analysis, "" if via == name else via,
+                            )
+                contributions = seen.values()
+                index[key] = ReverseLookup(
+                    names=tuple(sorted(name for name, _ in named)),
+                    symptoms=sort_symptoms({s for c in contributions for s in (*c.when, *c.any)}),
+                    rules=tuple(c for c in contributions if not c.syndrome),
+                    syndromes=tuple(sorted((c for c in contributions if c.syndrome), key=lambda c: rank[c.rule])),
+                )
+            return index
+
+        self._locations = build(location_rules)
+        self._vessels = build(vessel_rules)
+        self.location_names = tuple(sorted(location_rules))
+        self.vessel_names = tuple(sorted(vessel_rules))
+
+    def locations(self, name):
+        """What points to a lesion site; free-text names are standardized first."""
+        found = self._locations.get(name.strip().lower())
+        if found is None:
+            found = self._locations.get(self.anatomy.standardize(name).name.lower(), EMPTY)
+        return found
+
+    def vessels(self, name):
+        """What points to a vessel, including syndromes whose territory covers it."""
+        found = self._vessels.get(name.strip().lower())
+        if found is None:
+            found = self._vessels.get(self.ontology.standardize(name).lower(), EMPTY)
+        return found
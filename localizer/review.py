@@ -0,0 +1,264 @@
+"""Bulk chart review: raw note exports -> extracted symptoms -> localization results.
+
+    python -m localizer review notes.jsonl -o review/ --workers 4
+
+The input is memory-mapped and cut into shards of about --shard-size bytes at record
+boundaries (new lines for JSONL, --separator for plain text), so the file is never read
+into memory as a whole. Every shard is processed by a worker process, which runs the
+free-text extractor over each note and localizes the symptoms it finds (the note also
+serves as the chief complaint for the NIHSS keywords). Each shard's results go to their
+own columnar part file, CSV or Parquet, written every --chunk-rows rows.
+
+Part files are written under a temporary name and renamed when complete, so they
+double as checkpoints: rerunning the same command skips finished shards. The manifest
+refuses to resume when the input or the sharding has changed.
+
+A record that is not valid JSON, not an object, or whose text field is not a string is
+reported on stderr with its byte offset and skipped; the summary counts them.
+"""
+
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+from collections import deque
+
+from .cache import CachedLocalizer
+from .cli import RESULT_FIELDS
+from .engine import Localizer
+from .extract import extract_symptoms
+from .vocab import nihss_keyword_hits
+
+MANIFEST = "manifest.json"
+COLUMNS = ("id", "offset", "symptoms", "negated", "nihss_keywords") + RESULT_FIELDS
+
+
+class ReviewError(ValueError):
+    """The output directory belongs to a different input or sharding."""
+
+
+class _MalformedRecord(ValueError):
+    pass
+
+
+def shard_bounds(path, separator, shard_size):
+    """(start, end) byte ranges of about `shard_size`, each ending just after a separator."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            cut = mm.find(separator, min(start + shard_size, size))
+            end = size if cut == -1 else cut + len(separator)
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def iter_records(mm, start, end, separator):
+    """(offset, raw bytes) of the non-blank records between `start` and `end`."""
+    pos = start
+    while pos < end:
+        cut = mm.find(separator, pos, end)
+        if cut == -1:
+            cut = end
+        raw = mm[pos:cut]
+        if raw.strip():
+            yield pos, raw
+        pos = cut + len(separator)
+
+
+def _parse(offset, raw, fmt, id_field, text_field):
+    text = raw.decode("utf-8", errors="replace")
+    if fmt == "text":
+        return offset, text
+    try:
+        record = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise _MalformedRecord(f"invalid JSON ({e.msg})") from None
+    if not isinstance(record, dict):
+        raise _MalformedRecord("not a JSON object")
+    note = record.get(text_field) or ""
+    if not isinstance(note, str):
+        raise _MalformedRecord(f"{text_field!r} is not a string")
+    return record.get(id_field, offset), note
+
+
+class _CsvPart:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write(self, columns, separator=";"):
+        rows = zip(*(
+            [separator.join(v) if isinstance(v, (list, tuple)) else v for v in columns[name]] for name in COLUMNS
+        ))
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetPart:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)") from e
+        self.pa = pa
+        self.writer = None
+        self.path = path
+        self.pq = pq
+
+    def write(self, columns):
+        # Lists stay list<string> columns; ids are written as text since sources mix ints and strings
+        columns = dict(columns, id=[str(v) for v in columns["id"]])
+        table = self.pa.table({name: columns[name] for name in COLUMNS})
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            # Empty shard: still leave a readable file behind
+            self.pq.write_table(self.pa.table({name: [] for name in COLUMNS}), self.path)
+        else:
+            self.writer.close()
+
+
+_localizer = None
+
+
+def review_shard(task):
+    """Process one shard into its part file; runs inside the worker processes.
+
+    Returns (shard index, records reviewed, malformed records skipped).
+    """
+    global _localizer
+    if _localizer is None:
+        _localizer = CachedLocalizer(Localizer())
+    (path, index, start, end, separator, fmt, id_field, text_field, out_path, output_format, chunk_rows) = task
+
+    tmp = f"{out_path}.tmp"
+    part = _ParquetPart(tmp) if output_format == "parquet" else _CsvPart(tmp)
+    columns = {name: [] for name in COLUMNS}
+    count = malformed = 0
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset, raw in iter_records(mm, start, end, separator):
+                try:
+                    record_id, text = _parse(offset, raw, fmt, id_field, text_field)
+                except _MalformedRecord as e:
+                    print(f"{path}: skipped record at byte {offset}: {e}", file=sys.stderr)
+                    malformed += 1
+                    continue
+                found = extract_symptoms(text)
+                result = _localizer.localize(found.present, text).to_dict()
+                columns["id"].append(record_id)
+                columns["offset"].append(offset)
+                columns["symptoms"].append(list(found.present))
+                columns["negated"].append(list(found.negated))
+                columns["nihss_keywords"].append(sorted(nihss_keyword_hits(text)))
+                for field in RESULT_FIELDS:
+                    columns[field].append(result[field])
+                count += 1
+                if len(columns["id"]) >= chunk_rows:
+                    part.write(columns)
+                    columns = {name: [] for name in COLUMNS}
+        if columns["id"]:
+            part.write(columns)
+    finally:
+        part.close()
+    os.replace(tmp, out_path)
+    return index, count, malformed
+
+
+def _check_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ReviewError(f"{out_dir} holds results for a different input or settings; use a new output directory")
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def run_review(path, out_dir, fmt="jsonl", separator=None, id_field="id", text_field="text",
+               output_format="csv", workers=None, shard_size=64 << 20, chunk_rows=10000):
+    """Review every record in `path` into part files under `out_dir`.
+
+    Returns (records processed now, shards done now, shards skipped as already done,
+    malformed records skipped now).
+    With workers=0 everything runs in this process.
+    """
+    if separator is None:
+        separator = b"\n" if fmt == "jsonl" else b"\n\n"
+    stat = os.stat(path)
+    os.makedirs(out_dir, exist_ok=True)
+    _check_manifest(out_dir, {
+        "input": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+        "format": fmt, "separator": separator.decode("latin-1"), "shard_size": shard_size,
+        "output_format": output_format,
+    })
+
+    suffix = "parquet" if output_format == "parquet" else "csv"
+    tasks = []
+    skipped = 0
+    for index, (start, end) in enumerate(shard_bounds(path, separator, shard_size)):
+        out_path = os.path.join(out_dir, f"part-{index:05d}.{suffix}")
+        if os.path.exists(out_path):
+            skipped += 1
+            continue
+        tasks.append((path, index, start, end, separator, fmt, id_field, text_field, out_path, output_format, chunk_rows))
+
+    records = malformed = 0
+    if workers == 0:
+        for task in tasks:
+            _, count, bad = review_shard(task)
+            records += count
+            malformed += bad
+        return records, len(tasks), skipped, malformed
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(review_shard, task))
+            if len(pending) >= 2 * workers:
+                _, count, bad = pending.popleft().result()
+                records += count
+                malformed += bad
+        while pending:
+            _, count, bad = pending.popleft().result()
+            records += count
+            malformed += bad
+    return records, len(tasks), skipped, malformed
+
+
+def review(args):
+    separator = args.separator.encode("utf-8").decode("unicode_escape").encode("latin-1") if args.separator else None
+    start = time.perf_counter()
+    try:
+        records, done, skipped, malformed = run_review(
+            args.input, args.output, fmt=args.format, separator=separator, id_field=args.id_field,
+            text_field=args.text_field, output_format=args.output_format, workers=args.workers,
+            shard_size=args.shard_size << 20, chunk_rows=args.chunk_rows,
+        )
+    except ReviewError as e:
+        print(e, file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    rate = records / elapsed if elapsed else float("inf")
+    print(f"Reviewed {records} notes in {done} shard(s) in {elapsed:.2f}s ({rate:,.0f} notes/s); "
+          f"{skipped} shard(s) already done; {malformed} malformed record(s) skipped", file=sys.stderr)
+    return 0
@@ -0,0 +1,55 @@
+"""Compiled form of the localization rules (the rules themselves live in data/rules.json).
+
+Each chain is an if/elif: its branches are tried in order and only the first one whose
+symptoms are all selected (and, if given, at least one of `any` and none of `none`)
+fires. Chains are applied in order because lesion and vessel standardization is
+order-sensitive.
+
+The combined syndromes are not a chain: every one that matches applies, and they are
+looked up through a SyndromeIndex (see syndromes.py) rather than tried one by one.
+"""
+
+from typing import NamedTuple
+
+# `imaging` values: always suggest imaging, or only when the NIHSS calculator is in use.
+ALWAYS = "always"
+IF_NIHSS = "if_nihss"
+IMAGING = (ALWAYS, IF_NIHSS)
+
+
+class Rule(NamedTuple):
+    """One compiled branch of a rule chain, or one syndrome."""
+    name: str
+    when: frozenset
+    any: frozenset
+    lesions: tuple
+    vessels: tuple
+    notes: tuple
+    analysis: tuple
+    info: tuple
+    imaging: str
+    none: frozenset = frozenset()
+
+    def matches(self, selected):
+        return (self.when <= selected and (not self.any or not self.any.isdisjoint(selected))
+                and (not self.none or self.none.isdisjoint(selected)))
+
+
+def compile_rule(branch):
+    return Rule(
+        name=branch["name"],
+        when=frozenset(branch["when"]),
+        any=frozenset(branch.get("any", ())),
+        lesions=tuple(branch.get("lesions", ())),
+        vessels=tuple(branch.get("vessels", ())),
+        notes=tuple(branch.get("notes", ())),
+        analysis=tuple(branch.get("analysis", ())),
+        info=tuple(branch.get("info", ())),
+        imaging=branch.get("imaging", ALWAYS),
+        none=frozenset(branch.get("none", ())),
+    )
+
+
+def compile_rules(chains):
+    """Freeze declarative chains (lists of rule dicts) into tuples of Rule."""
+    return tuple(tuple(compile_rule(branch) for branch in chain) for chain in chains)
@@ -0,0 +1,297 @@
+"""Lightweight JSON HTTP service for EHR integration: `python -m localizer serve`.
+
+Endpoints (all JSON):
+
+    GET  /health            {"status": "ok", "version": ..., "cache": {...}}
+    POST /localize          {"symptoms": [...], "chief_complaint": "..."} -> result
+    POST /localize/batch    {"cases": [{...}, ...]} -> {"results": [...]}
+    POST /nihss             {"scores": {"item": score, ...}} -> {"total", "missing", "invalid"}
+    POST /nihss/batch       {"exams": [{"scores": {...}}, ...]} -> {"results": [...]}
+    POST /extract           {"text": "..."} -> {"present": [...], "negated": [...]}
+    POST /reverse           {"location": "..."} or {"vessel": "..."} -> {"names", "symptoms", "rules", "syndromes"}
+    GET  /metrics           Prometheus text format (timings need `serve --metrics`)
+
+Plain HTTP/1.1 on asyncio streams with no third-party dependencies. Connections are kept
+alive, pipelined requests on a connection are handled concurrently and answered in
+order, and a server-wide semaphore bounds the number of requests in progress. Large
+batches are localized in a worker thread so they do not stall the event loop.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from http import HTTPStatus
+
+from .cache import CachedLocalizer
+from .engine import Localizer
+from .extract import extract_symptoms
+from .knowledge import load_knowledge
+from .metrics import registry
+from .nihss import score_nihss
+
+MAX_BODY = 8 * 1024 * 1024
+MAX_HEADER_LINES = 100
+# Batches larger than this run in a worker thread instead of on the event loop
+INLINE_BATCH = 64
+
+logger = logging.getLogger(__name__)
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+def _case(payload):
+    if not isinstance(payload, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "each case must be an object")
+    symptoms = payload.get("symptoms") or []
+    chief_complaint = payload.get("chief_complaint") or ""
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "'symptoms' must be a list of strings")
+    if not isinstance(chief_complaint, str):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "'chief_complaint' must be a string")
+    return symptoms, chief_complaint
+
+
+def _scores(payload):
+    scores = payload.get("scores") if isinstance(payload, dict) else None
+    if not isinstance(scores, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "'scores' must be an object of item: score")
+    return scores
+
+
+def _content_length(value):
+    """The Content-Length header as a byte count; anything but plain digits is a bad request."""
+    if not value:
+        return 0
+    # int() alone would also take a sign, underscores and surrounding spaces
+    if not (value.isascii() and value.isdigit()):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "malformed Content-Length")
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "malformed Content-Length") from None
+
+
+class LocalizerService:
+    """Request handling, independent of the transport."""
+
+    def __init__(self, localizer=None, knowledge=None):
+        self.knowledge = knowledge if knowledge is not None else load_knowledge()
+        self.localizer = localizer if localizer is not None else CachedLocalizer(Localizer(self.knowledge))
+
+    def localize(self, payload):
+        return self.localizer.localize(*_case(payload)).to_dict()
+
+    def localize_batch(self, cases):
+        return [self.localizer.localize(symptoms, chief_complaint).to_dict() for symptoms, chief_complaint in cases]
+
+    def nihss(self, payload):
+        return score_nihss(_scores(payload), self.knowledge.nihss_items)._asdict()
+
+    async def handle(self, method, path, payload):
+        if path == "/health":
+            if method != "GET":
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+            cache = getattr(self.localizer, "cache", None)
+            return {"status": "ok", "version": self.knowledge.version,
+                    "cache": cache.stats() if cache is not None else None}
+        if path == "/metrics":
+            if method != "GET":
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+            return registry.prometheus(getattr(self.localizer, "cache", None))
+        routes = {
+            "/localize": self._localize,
+            "/localize/batch": self._localize_batch,
+            "/nihss": self._nihss,
+            "/nihss/batch": self._nihss_batch,
+            "/extract": self._extract,
+            "/reverse": self._reverse,
+        }
+        route = routes.get(path)
+        if route is None:
+            raise HttpError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED)
+        return await route(payload)
+
+    async def _localize(self, payload):
+        return self.localize(payload)
+
+    async def _localize_batch(self, payload):
+        cases = payload.get("cases") if isinstance(payload, dict) else None
+        if not isinstance(cases, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "'cases' must be a list")
+        cases = [_case(case) for case in cases]
+        if len(cases) <= INLINE_BATCH:
+            results = self.localize_batch(cases)
+        else:
+            results = await asyncio.get_running_loop().run_in_executor(None, self.localize_batch, cases)
+        return {"results": results}
+
+    async def _extract(self, payload):
+        text = payload.get("text") if isinstance(payload, dict) else None
+        if not isinstance(text, str):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "'text' must be a string")
+        return extract_symptoms(text)._asdict()
+
+    async def _reverse(self, payload):
+        payload = payload if isinstance(payload, dict) else {}
+        location, vessel = payload.get("location"), payload.get("vessel")
+        if isinstance(location, str) and vessel is None:
+            return self.localizer.reverse.locations(location).to_dict()
+        if isinstance(vessel, str) and location is None:
+            return self.localizer.reverse.vessels(vessel).to_dict()
+        raise HttpError(HTTPStatus.BAD_REQUEST, "give one of 'location' or 'vessel' as a string")
+
+    async def _nihss(self, payload):
+        return self.nihss(payload)
+
+    async def _nihss_batch(self, payload):
+        exams = payload.get("exams") if isinstance(payload, dict) else None
+        if not isinstance(exams, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "'exams' must be a list")
+        return {"results": [self.nihss(exam) for exam in exams]}
+
+
+class HttpServer:
+    """HTTP/1.1 front end with keep-alive, pipelining and bounded concurrency."""
+
+    def __init__(self, service, max_concurrency=64, max_pipeline=32, idle_timeout=30.0):
+        self.service = service
+        self.max_pipeline = max_pipeline
+        self.idle_timeout = idle_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=64 * 1024)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        # The reader parses requests and starts handling them straight away; the responder
+        # writes the responses back in request order, as HTTP/1.1 pipelining requires.
+        responses = asyncio.Queue(self.max_pipeline)
+        responder = asyncio.create_task(self._respond(responses, writer))
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except HttpError as e:
+                    await responses.put(self._done(self._error(e), False))
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                method, path, payload, keep_alive = request
+                await responses.put(asyncio.create_task(self._dispatch(method, path, payload, keep_alive)))
+                if not keep_alive:
+                    break
+        finally:
+            try:
+                await responses.put(None)
+                await responder
+            finally:
+                writer.close()
+
+    @staticmethod
+    def _done(response, keep_alive):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result((response, keep_alive))
+        return future
+
+    async def _respond(self, responses, writer):
+        closing = False
+        while True:
+            pending = await responses.get()
+            if pending is None:
+                return
+            if closing:
+                # Requests pipelined after a Connection: close response are not answered
+                pending.cancel()
+                continue
+            (status, body), keep_alive = await pending
+            try:
+                writer.write(self._encode(status, body, keep_alive))
+                await writer.drain()
+            except ConnectionError:
+                closing = True
+            if not keep_alive:
+                # Keep draining the queue so the reader never blocks on it; closing the
+                # transport ends the reader's next read.
+                closing = True
+                writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        length = _content_length(headers.get("content-length"))
+        if length > MAX_BODY:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method.upper(), target.split("?", 1)[0], body, keep_alive
+
+    async def _dispatch(self, method, path, body, keep_alive):
+        async with self._slots:
+            try:
+                try:
+                    payload = json.loads(body) if body else {}
+                except (ValueError, RecursionError):
+                    # RecursionError: nested deeper than the parser's stack allows
+                    return self._error(HttpError(HTTPStatus.BAD_REQUEST, "body is not valid JSON")), keep_alive
+                return (HTTPStatus.OK, await self.service.handle(method, path, payload)), keep_alive
+            except HttpError as e:
+                return self._error(e), keep_alive
+            except Exception:
+                logger.exception("unhandled error handling %s %s", method, path)
+                return self._error(HttpError(HTTPStatus.INTERNAL_SERVER_ERROR)), False
+
+    @staticmethod
+    def _error(error):
+        return error.status, {"error": str(error)}
+
+    @staticmethod
+    def _encode(status, body, keep_alive):
+        # Handlers return JSON-able objects, except /metrics which returns exposition text
+        if isinstance(body, str):
+            data, content_type = body.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            data, content_type = json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode("latin-1") + data
+
+
+def serve(host="127.0.0.1", port=8765, max_concurrency=64, max_pipeline=32, metrics=False):
+    if metrics:
+        registry.enabled = True
+    server = HttpServer(LocalizerService(), max_concurrency=max_concurrency, max_pipeline=max_pipeline)
+    print(f"Serving localization API on http://{host}:{port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,96 @@
+"""Superset index over the combined syndromes.
+
+Every syndrome whose symptoms are all selected applies (it is not first-match-wins like
+a rule chain), and a selection is only checked against the syndromes that could match
+it. Each syndrome is filed under the pair of its two least common `when` symptoms, or
+under its single symptom when it has only one, so a selection of k symptoms looks in at
+most k single and k(k-1)/2 pair buckets instead of testing every syndrome. Candidates
+are then verified as bitmasks: all of `when`, one of `any` if given, none of `none`.
+
+Matches are ranked by specificity: the number of symptoms a syndrome requires (its
+`any` clause counting as one), then the number it excludes, then file order.
+"""
+
+from collections import Counter, defaultdict
+
+from .vocab import SYMPTOMS
+
+
+def specificity(rule):
+    return len(rule.when) + bool(rule.any), len(rule.none)
+
+
+class SyndromeIndex:
+    """Syndromes in rank order plus the buckets used to find candidates."""
+
+    def __init__(self, syndromes, symptoms=SYMPTOMS):
+        self.bits = {s: 1 << i for i, s in enumerate(symptoms)}
+        order = sorted(range(len(syndromes)), key=lambda i: tuple(-n for n in specificity(syndromes[i])) + (i,))
+        self.ranked = tuple(syndromes[i] for i in order)
+        # Symptoms whose change can change the matches
+        self.symptoms = frozenset(s for rule in self.ranked for s in rule.when | rule.any | rule.none)
+
+        frequency = Counter(s for rule in self.ranked for s in rule.when)
+        self._singles = defaultdict(list)  # symptom bit -> entries
+        self._pairs = defaultdict(list)    # mask of two symptom bits -> entries
+        for rank, rule in enumerate(self.ranked):
+            entry = (rank, self.encode(rule.when), self.encode(rule.any), self.encode(rule.none))
+            key = self.encode(sorted(rule.when, key=lambda s: (frequency[s], self.bits[s]))[:2])
+            (self._pairs if len(rule.when) > 1 else self._singles)[key].append(entry)
+        self._singles = dict(self._singles)
+        self._pairs = dict(self._pairs)
+        self._single_keys = self.encode(s for rule in self.ranked if len(rule.when) == 1 for s in rule.when)
+        self._pair_keys = 0
+        for key in self._pairs:
+            self._pair_keys |= key
+
+    def __len__(self):
+        return len(self.ranked)
+
+    def encode(self, symptoms):
+        mask = 0
+        for s in symptoms:
+            mask |= self.bits.get(s, 0)
+        return mask
+
+    def match(self, selected):
+        """Syndromes satisfied by the selected symptoms, most specific first."""
+        return self.match_mask(self.encode(selected))
+
+    def match_mask(self, mask):
+        singles = mask & self._single_keys
+        keyed = mask & self._pair_keys
+        if not singles and not keyed & (keyed - 1):
+            return ()
+
+        candidates = []
+        while singles:
+            bit = singles & -singles
+            candidates += self._singles[bit]
+            singles ^= bit
+        bits = []
+        rest = keyed
+        while rest:
+            bit = rest & -rest
+            bits.append(bit)
+            rest ^= bit
+        if len(bits) * (len(bits) - 1) // 2 <= len(self._pairs):
+            for i, a in enumerate(bits):
+                for b in bits[i + 1:]:
+                    entries = self._pairs.get(a | b)
+                    if entries:
+                        candidates += entries
+        else:
+            for key, entries in self._pairs.items():
+                if key & keyed == key:
+                    candidates += entries
+
+        found = [
+            rank for rank, when, any_, none in candidates
+            if when & mask == when and (not any_ or any_ & mask) and not none & mask
+        ]
+        if not found:
+            return ()
+        found.sort()
+        ranked = self.ranked
+        return tuple([ranked[rank] for rank in found])
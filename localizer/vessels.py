@@ -0,0 +1,94 @@
+"""Vessel name standardization and the vessel hierarchy used for de-duplication."""
+
+from .matching import PriorityMatcher
+
+# Canonical vessels and the lower-case patterns that identify them in free text,
+# in matching priority order (most specific forms first).
+VESSEL_PATTERNS = (
+    ("Middle Cerebral Artery (MCA) - Superior Division", ("middle cerebral artery (mca) - superior division",)),
+    ("Middle Cerebral Artery (MCA) - Inferior Division", ("middle cerebral artery (mca) - inferior division",)),
+    ("Posterior Inferior Cerebellar Artery (PICA)", ("posterior inferior cerebellar artery (pica)",)),
+    ("Anterior Inferior Cerebellar Artery (AICA)", ("anterior inferior cerebellar artery (aica)",)),
+    ("Superior Cerebellar Artery (SCA)", ("superior cerebellar artery (sca)",)),
+    ("Lenticulostriate arteries", ("lenticulostriate arteries",)),
+    ("Thalamoperforating arteries", ("thalamoperforating arteries",)),
+    ("Anterior Cerebral Artery (ACA)", ("anterior cerebral artery (aca)",)),
+    ("Posterior Cerebral Artery (PCA) - Calcarine branch", ("posterior cerebral artery (pca) - calcarine branch",)),
+    ("Posterior Cerebral Artery (PCA)", ("posterior cerebral artery (pca)",)),
+    ("Basilar Artery", ("basilar artery",)), # Keeping it general here, specialized branches are canonical names of their own
+    ("Vertebral Artery", ("vertebral artery",)),
+    ("Ophthalmic Artery", ("ophthalmic artery",)),
+    ("Internal Carotid Artery (ICA)", ("internal carotid artery",)),
+    ("External Carotid Artery (ECA)", ("external carotid artery",)),
+    ("Spinal Arteries", ("spinal arteries",)),
+    ("Anterior Choroidal Artery", ("anterior choroidal artery",)),
+    # General arterial systems / groups (less specific, but still useful)
+    ("Middle Cerebral Artery (MCA) branches", ("middle cerebral artery (mca) branches", "mca branches")),
+    ("Basilar Artery branches (pontine arteries)", ("pontine arteries",)),
+    ("Contralateral Middle Cerebral Artery (MCA) branches", ()),
+    ("Contralateral Lenticulostriate arteries", ()),
+    ("Contralateral Posterior Cerebral Artery (PCA) - Calcarine branch", ()),
+    ("Contralateral Thalamoperforating arteries", ()),
+)
+
+# Specific vessel -> the more general vessel it makes redundant when present.
+VESSEL_PARENTS = {
+    "Middle Cerebral Artery (MCA) - Superior Division": "Middle Cerebral Artery (MCA) branches",
+    "Middle Cerebral Artery (MCA) - Inferior Division": "Middle Cerebral Artery (MCA) branches",
+    "Lenticulostriate arteries": "Middle Cerebral Artery (MCA) branches",
+    "Posterior Inferior Cerebellar Artery (PICA)": "Basilar Artery branches (pontine arteries)",
+    "Anterior Inferior Cerebellar Artery (AICA)": "Basilar Artery branches (pontine arteries)",
+    "Superior Cerebellar Artery (SCA)": "Basilar Artery branches (pontine arteries)",
+    "Thalamoperforating arteries": "Posterior Cerebral Artery (PCA)",
+    "Posterior Cerebral Artery (PCA) - Calcarine branch": "Posterior Cerebral Artery (PCA)",
+    "Ophthalmic Artery": "Internal Carotid Artery (ICA)",
+    "Anterior Choroidal Artery": "Internal Carotid Artery (ICA)",
+    "Contralateral Middle Cerebral Artery (MCA) branches": "Middle Cerebral Artery (MCA) branches", # Generalizes side for comparison
+    "Contralateral Lenticulostriate arteries": "Lenticulostriate arteries",
+    "Contralateral Posterior Cerebral Artery (PCA) - Calcarine branch": "Posterior Cerebral Artery (PCA) - Calcarine branch",
+    "Contralateral Thalamoperforating arteries": "Thalamoperforating arteries",
+}
+
+
+class VesselOntology:
+    """Canonical vessel IDs, parent links and their precomputed transitive closure.
+
+    Built once; the Catalog turns the closure into bitmasks, so superseding general
+    vessels by their branches is a mask test instead of a rescan of the parent map.
+    """
+
+    def __init__(self, patterns=VESSEL_PATTERNS, parents=VESSEL_PARENTS):
+        names = [name for name, _ in patterns]
+        names += [name for link in parents.items() for name in link if name not in names]
+        self.ids = {name: i for i, name in enumerate(dict.fromkeys(names))}
+        self.parents = dict(parents)
+        self._matcher = PriorityMatcher(patterns)
+
+        ancestors = {}
+        for name in self.ids:
+            chain = []
+            parent = self.parents.get(name)
+            while parent is not None and parent not in chain:
+                chain.append(parent)
+                parent = self.parents.get(parent)
+            ancestors[name] = frozenset(chain)
+        descendants = {name: set() for name in self.ids}
+        for name, above in ancestors.items():
+            for parent in above:
+                descendants[parent].add(name)
+        self.ancestors = ancestors
+        self.descendants = {name: frozenset(below) for name, below in descendants.items()}
+
+    def standardize(self, vessel_str):
+        """Canonical name for a vessel mention; unknown names are returned stripped."""
+        vessel = vessel_str.strip()
+        if vessel in self.ids:
+            return vessel
+        return self._matcher.match(vessel, vessel)
+
+    def covered_by(self, vessels):
+        """The given canonical vessels together with every general vessel they account for."""
+        covered = set(vessels)
+        for vessel in vessels:
+            covered |= self.ancestors.get(vessel, frozenset())
+        return covered
@@ -0,0 +1,76 @@
+"""Symptom vocabulary and NIHSS keywords shared by the UI and the engine."""
+
+from .matching import PriorityMatcher
+
+# Options offered by the "Choose symptom(s):" multiselect, in display order.
+SYMPTOMS = (
+    "Right hemiparesis (Upper & Lower equally)",
+    "Right hemiparesis (Upper> Lower)",
+    "Right hemiparesis (Lower> Upper)",
+    "Left hemiparesis (Upper & Lower equally)",
+    "Left hemiparesis (Upper> Lower)",
+    "Left hemiparesis (Lower> Upper)",
+    "Aphasia",
+    "Neglect",
+    "Facial palsy (Upper & Lower face equally affected)",
+    "Facial palsy (Lower face only affected)",
+    "Vertigo",
+    "Dysarthria",
+    "Partial seizure",
+    "Generalized seizure",
+    "Emotional disturbances",
+    "Vision loss (Homonymous Hemianopia)",
+    "Vision loss (Unilateral - optic nerve related)",
+    "Ataxia (Limb)",
+    "Ataxia (Truncal)",
+    "Sensory loss (Hemibody, all modalities)",
+    "Sensory loss (Dissociated - e.g. pain/temp affected, light touch spared)",
+    "Tongue deviation",
+    "Horner’s syndrome",
+    "Gaze palsy (Conjugate, toward lesion)",
+    "Gaze palsy (Conjugate, away from lesion)",
+    "Gaze palsy (Internuclear Ophthalmoplegia - INO)",
+    "Vertical gaze palsy",
+    "Oculomotor palsy (CN III - ptosis, eye down & out)",
+    "Abducens palsy (CN VI - impaired abduction)",
+    "Decreased level of consciousness (drowsy/stuporous)",
+    "Chorea",
+    "Hemiballism",
+    "Nystagmus",
+    "Hiccup (Persistent/Intractable)",
+)
+
+# Hemiparesis options by the side of the weakness. A one-sided hemiparesis resolves rule
+# locations named relative to the deficit ("Contralateral Thalamus") to a side.
+HEMIPARESIS = {
+    "Right": frozenset(SYMPTOMS[0:3]),
+    "Left": frozenset(SYMPTOMS[3:6]),
+}
+
+# Any of these in the chief complaint or a selected symptom brings up the NIHSS calculator.
+NIHSS_KEYWORDS = (
+    "weakness", "numbness", "mute", "stuporous", "palsy", "dysarthria", "hemiparesis", "aoc",
+    "alteration", "weak", "numb", "passing out", "seizure", "aphasia", "neglect", "vertigo",
+    "ataxia", "sensory loss", "gaze palsy", "chorea", "hemiballism", "nystagmus", "hiccup",
+)
+
+def nihss_widget_key(item):
+    """Streamlit widget key for an NIHSS item (kept stable so session state survives upgrades)."""
+    return "nihss_" + item.replace(' ', '_').replace('–', '').replace('&', '').replace('(', '').replace(')', '').replace(',', '').lower()
+
+
+# One automaton for all keywords, so long pasted notes are scanned once rather than once per keyword.
+_nihss_matcher = PriorityMatcher([(keyword, (keyword,)) for keyword in NIHSS_KEYWORDS])
+
+
+def has_nihss_keyword(text):
+    return _nihss_matcher.match(text) is not None
+
+
+def nihss_keyword_hits(text):
+    """The NIHSS keywords that occur in `text`."""
+    return frozenset(_nihss_matcher.find_all(text))
+
+
+# Multiselect options that on their own bring up the NIHSS calculator.
+NIHSS_SYMPTOMS = frozenset(s for s in SYMPTOMS if has_nihss_keyword(s))
@@ -0,0 +1,59 @@
+import json
+import sqlite3
+
+import pytest
+
+from localizer import audit
+from localizer.audit import AuditLog
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit, "RETRY_DELAY", 0.001)
+    log = AuditLog(str(tmp_path / "audit.sqlite3"))
+    yield log
+    log.close()
+
+
+def test_records_are_written(log):
+    log.record_nihss(["Vertigo"], "dizzy", {"1a": 1}, 1)
+    log.flush()
+    [event] = log.query()
+    assert event["symptoms"] == ["Vertigo"]
+    assert event["nihss_total"] == 1
+
+
+def test_failed_batch_goes_to_fallback_file(log):
+    connection = sqlite3.connect(log.path)
+    connection.execute("DROP TABLE events")
+    connection.commit()
+    connection.close()
+
+    log.record_nihss(["Vertigo"], "dizzy", {"1a": 1}, 1)
+    log.flush()
+    assert log.stats()["failures"] == audit.RETRIES
+    assert log.spilled == 1
+    with open(log.fallback_path) as f:
+        [record] = [json.loads(line) for line in f]
+    assert record["kind"] == audit.NIHSS
+    assert record["nihss_total"] == 1
+
+
+def test_unencodable_event_does_not_stop_the_writer(log):
+    log.record_localization(["Vertigo"], "dizzy", object())
+    log.record_nihss(["Vertigo"], "dizzy", {"1a": 1}, 1)
+    log.flush()
+    assert log.written == 1
+    assert log.spilled == 1
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_writer_raises_instead_of_blocking(log):
+    def stop(*args):
+        raise SystemExit
+
+    log._store = stop
+    log.record_nihss(["Vertigo"], "dizzy", {}, 0)
+    log._writer.join(5)
+    with pytest.raises(RuntimeError):
+        log.record_nihss(["Vertigo"], "dizzy", {}, 0)
@@ -0,0 +1,51 @@
+import io
+import json
+
+import pytest
+
+from localizer.cli import CaseError, main, read_cases
+
+
+def test_reads_jsonl_cases():
+    stream = io.StringIO('{"id": 7, "symptoms": ["Vertigo"], "chief_complaint": "dizzy"}\n\n{}\n')
+    assert list(read_cases(stream, "jsonl")) == [(7, ["Vertigo"], "dizzy"), (None, [], "")]
+
+
+def test_reads_csv_cases():
+    stream = io.StringIO("id,symptoms,chief_complaint\n1,Vertigo; Nystagmus,dizzy\n")
+    assert list(read_cases(stream, "csv")) == [("1", ["Vertigo", "Nystagmus"], "dizzy")]
+
+
+@pytest.mark.parametrize("line", [
+    '{"symptoms": "Vertigo"}',
+    '{"symptoms": ["Vertigo", 3]}',
+    '{"chief_complaint": 5}',
+    '["Vertigo"]',
+    '{"symptoms": [',
+])
+def test_bad_case_names_its_line(line):
+    stream = io.StringIO('{"symptoms": ["Vertigo"]}\n' + line + "\n")
+    cases = read_cases(stream, "jsonl")
+    assert next(cases) == (None, ["Vertigo"], "")
+    with pytest.raises(CaseError, match="^line 2: "):
+        next(cases)
+
+
+def test_bad_lines_are_skipped_and_reported():
+    stream = io.StringIO('{"symptoms": "Vertigo"}\n{"id": 2, "symptoms": ["Vertigo"]}\n[1]\n')
+    skipped = []
+    cases = list(read_cases(stream, "jsonl", skip=lambda number, reason: skipped.append(number)))
+    assert cases == [(2, ["Vertigo"], "")]
+    assert skipped == [1, 3]
+
+
+@pytest.mark.parametrize("workers", ["0", "2"])
+def test_batch_keeps_going_past_bad_lines_and_fails_at_the_end(tmp_path, capsys, workers):
+    source = tmp_path / "cases.jsonl"
+    source.write_text('{"id": 1, "symptoms": ["Vertigo"]}\n{"symptoms": "Vertigo"}\n{"id": 3}\n', encoding="utf-8")
+    target = tmp_path / "results.jsonl"
+    assert main(["batch", str(source), "-o", str(target), "--workers", workers, "--chunk-size", "1"]) == 1
+    assert [json.loads(line)["id"] for line in target.read_text(encoding="utf-8").splitlines()] == [1, 3]
+    err = capsys.readouterr().err
+    assert "skipped line 2: 'symptoms' must be a list of strings" in err
+    assert "1 malformed line(s) skipped" in err
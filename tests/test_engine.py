@@ -0,0 +1,113 @@
+"""Localizer against the original One.py rules, and the other paths against Localizer.
+
+data/one_py_outputs.jsonl holds what One.py's inline rules produced (as of the first
+commit) for the empty case and every single symptom and pair of symptoms, wherever the
+engine still agrees. The remaining combinations changed on purpose; the tests below the
+fixture pin one example of each change.
+"""
+
+import itertools
+import json
+import os
+import random
+
+import pytest
+
+from localizer.bulk import BulkScorer
+from localizer.cache import CachedLocalizer
+from localizer.engine import Localizer
+from localizer.incremental import IncrementalLocalizer
+from localizer.vocab import SYMPTOMS
+
+ONE_PY_OUTPUTS = os.path.join(os.path.dirname(__file__), "data", "one_py_outputs.jsonl")
+
+RIGHT_HEMIPARESIS = "Right hemiparesis (Upper> Lower)"
+HEMIANOPIA = "Vision loss (Homonymous Hemianopia)"
+HORNER = "Horner’s syndrome"
+DYSARTHRIA = "Dysarthria"
+HEMISENSORY = "Sensory loss (Hemibody, all modalities)"
+WALLENBERG = [
+    "Vertigo",
+    "Dysarthria",
+    "Facial palsy (Upper & Lower face equally affected)",
+    "Sensory loss (Dissociated - e.g. pain/temp affected, light touch spared)",
+]
+
+
+@pytest.fixture(scope="module")
+def localizer():
+    return Localizer()
+
+
+def _one_py_cases():
+    with open(ONE_PY_OUTPUTS, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("expected", _one_py_cases(), ids=lambda case: " + ".join(case["symptoms"]) or "none")
+def test_matches_one_py(localizer, expected):
+    result = localizer.localize(expected["symptoms"]).to_dict()
+    for field, value in expected.items():
+        if field != "symptoms":
+            assert (sorted(result[field]) if isinstance(value, list) else result[field]) == value, field
+
+
+def test_basilar_branches_keep_their_name(localizer):
+    # One.py folded "Basilar Artery branches (pontine arteries)" into "Basilar Artery"
+    assert localizer.localize([DYSARTHRIA]).affected_vessels == {
+        "Basilar Artery branches (pontine arteries)", "Lenticulostriate arteries"}
+
+
+def test_specific_vessels_supersede_their_parents(localizer):
+    # One.py also listed the Basilar Artery, an ancestor of PICA in the vessel ontology
+    assert localizer.localize([HORNER]).affected_vessels == {
+        "Internal Carotid Artery (ICA)", "Posterior Inferior Cerebellar Artery (PICA)"}
+
+
+def test_lacunar_syndromes_are_named(localizer):
+    assert localizer.localize([HEMISENSORY]).ranked_analysis == (
+        "Thalamoperforating arteries (from PCA) - for Pure Sensory Lacunar Syndrome (ventral posterolateral thalamus)",)
+
+
+def test_hemiparesis_side_lateralizes_every_relative_location(localizer):
+    # One.py only lateralized the locations of the hemiparesis rule itself
+    assert localizer.localize([RIGHT_HEMIPARESIS, HEMIANOPIA]).lesion_locations == {
+        "Left Motor Cortex", "Left Occipital Lobe", "Left Temporal Lobe", "Left Thalamus"}
+
+
+def test_wallenberg(localizer):
+    result = localizer.localize(WALLENBERG)
+    assert "Lateral Medulla (Brainstem)" in result.lesion_locations
+    assert "Posterior Inferior Cerebellar Artery (PICA)" in result.affected_vessels
+    assert result.suggest_imaging
+
+
+def test_chief_complaint_turns_on_nihss(localizer):
+    assert not localizer.localize([HORNER], "droopy eyelid").use_nihss
+    assert localizer.localize([HORNER], "sudden weakness").use_nihss
+
+
+def _combinations():
+    rng = random.Random(0)
+    cases = [()] + [(s,) for s in SYMPTOMS] + list(itertools.combinations(SYMPTOMS, 2))
+    cases += [tuple(rng.sample(SYMPTOMS, rng.randint(3, 9))) for _ in range(300)]
+    complaints = ("", "sudden weakness", "dizzy")
+    return [(list(case), complaints[i % len(complaints)]) for i, case in enumerate(cases)]
+
+
+def test_bulk_incremental_and_cached_match_the_engine(localizer):
+    cases = _combinations()
+    expected = [localizer.localize(symptoms, complaint) for symptoms, complaint in cases]
+
+    scored = BulkScorer(localizer).score(cases)
+    assert [scored.row(i) for i in range(len(cases))] == expected
+
+    # One session walking through every case, so each step is a mix of additions and removals
+    incremental = IncrementalLocalizer(localizer)
+    state = incremental.new_state()
+    assert [incremental.localize(symptoms, complaint, state=state) for symptoms, complaint in cases] == expected
+
+    # Twice over: the second pass is served from the cache
+    cached = CachedLocalizer(localizer)
+    for _ in range(2):
+        assert [cached.localize(symptoms, complaint) for symptoms, complaint in cases] == expected
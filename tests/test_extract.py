@@ -0,0 +1,109 @@
+import pytest
+
+from localizer.extract import SymptomExtractor, extract_symptoms, tokenize
+
+HICCUP = "Hiccup (Persistent/Intractable)"
+
+
+def test_tokenize_keeps_commas_and_breaks():
+    assert tokenize("Denies vertigo, nausea. Has hiccups") == ["denies", "vertigo", ",", "nausea", ".", "has", "hiccups"]
+
+
+def test_synonyms_map_to_options():
+    found = extract_symptoms("sudden slurred speech with left facial droop and right arm weakness")
+    assert found.present == (
+        "Right hemiparesis (Upper> Lower)", "Facial palsy (Lower face only affected)", "Dysarthria",
+    )
+    assert found.negated == ()
+
+
+def test_longest_phrase_wins():
+    assert extract_symptoms("homonymous hemianopia").present == ("Vision loss (Homonymous Hemianopia)",)
+    assert extract_symptoms("ptosis and miosis").present == ("Horner’s syndrome",)
+
+
+@pytest.mark.parametrize("text", [
+    "no longer has hiccups",
+    "denies hiccups",
+    "hiccups resolved",
+    "hiccups were denied",
+    "hiccups was denied",
+])
+def test_negated(text):
+    found = extract_symptoms(text)
+    assert found.present == ()
+    assert found.negated == (HICCUP,)
+
+
+@pytest.mark.parametrize("text", ["not only hiccups", "hiccups have not resolved", "no improvement in hiccups"])
+def test_pseudo_negation_keeps_finding(text):
+    assert extract_symptoms(text).present == (HICCUP,)
+
+
+def test_long_review_of_systems_list_is_negated_to_its_end():
+    text = ("denies headache, nausea, vomiting, chest pain, fever, chills, cough, diarrhea, dysuria, rash, "
+            "vertigo or hiccups")
+    found = extract_symptoms(text)
+    assert found.present == ()
+    assert found.negated == ("Vertigo", HICCUP)
+
+
+def test_window_still_expires_without_a_list():
+    found = extract_symptoms("no fever at any point over the last several days of the admission then vertigo")
+    assert found.present == ("Vertigo",)
+
+
+def test_but_ends_the_scope():
+    found = extract_symptoms("denies vertigo but has nystagmus")
+    assert found.present == ("Nystagmus",)
+    assert found.negated == ("Vertigo",)
+
+
+def test_clause_break_ends_the_scope():
+    assert extract_symptoms("denies fever; vertigo since this morning").present == ("Vertigo",)
+    assert extract_symptoms("no headache.\nslurred speech").present == ("Dysarthria",)
+
+
+@pytest.mark.parametrize("text, present", [
+    ("no fever or chills, has slurred speech", ("Dysarthria",)),
+    ("denies chest pain and has vertigo", ("Vertigo",)),
+    ("no headache, presents with right arm weakness", ("Right hemiparesis (Upper> Lower)",)),
+])
+def test_affirming_words_end_the_scope(text, present):
+    found = extract_symptoms(text)
+    assert found.present == present
+    assert found.negated == ()
+
+
+@pytest.mark.parametrize("text, present", [
+    ("Slurred speech and right arm weakness, CT head negative", ("Right hemiparesis (Upper> Lower)", "Dysarthria")),
+    ("vertigo and nystagmus, Dix-Hallpike negative", ("Vertigo", "Nystagmus")),
+    ("right hemiparesis, aphasia, hemorrhage ruled out", ("Right hemiparesis (Upper & Lower equally)", "Aphasia")),
+])
+def test_trailing_cue_about_a_test_keeps_earlier_findings(text, present):
+    found = extract_symptoms(text)
+    assert found.present == present
+    assert found.negated == ()
+
+
+def test_trailing_cue_negates_only_the_finding_before_it():
+    found = extract_symptoms("vertigo and nystagmus resolved")
+    assert found.present == ("Vertigo",)
+    assert found.negated == ("Nystagmus",)
+
+
+def test_post_negation_stays_in_its_clause():
+    found = extract_symptoms("vertigo since noon. nystagmus was denied")
+    assert found.present == ("Vertigo",)
+    assert found.negated == ("Nystagmus",)
+
+
+def test_present_mention_wins_over_negated():
+    found = extract_symptoms("no vertigo at rest. vertigo on standing")
+    assert found.present == ("Vertigo",)
+    assert found.negated == ()
+
+
+def test_unknown_symptom_rejected():
+    with pytest.raises(ValueError):
+        SymptomExtractor(synonyms=(("Not an option", ("foo",)),))
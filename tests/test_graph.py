@@ -0,0 +1,55 @@
+import pytest
+
+from localizer.engine import Localizer
+
+CHOREA = "Chorea"
+RIGHT_HEMIPARESIS = "Right hemiparesis (Lower> Upper)"
+LEFT_HEMIPARESIS = "Left hemiparesis (Lower> Upper)"
+
+
+@pytest.fixture(scope="module")
+def localizer():
+    return Localizer()
+
+
+@pytest.fixture(scope="module")
+def graph(localizer):
+    return localizer.graph
+
+
+def test_resolve_takes_the_side_a_relative_location_points_to(graph):
+    assert graph.resolve("Thalamus", "Contralateral", "Right") == "Left Thalamus"
+    assert graph.resolve("Thalamus", "Ipsilateral", "Right") == "Right Thalamus"
+    assert graph.resolve("Thalamus", "Contralateral", None) == "Thalamus"
+    # No side forms to resolve to
+    assert graph.resolve("Cerebellum", "Contralateral", "Right") == "Cerebellum"
+
+
+def test_containment_is_transitive_and_one_way(graph):
+    assert graph.contains("Brainstem (General)", "Lateral Medulla (Brainstem)")
+    assert graph.contains("Spinal Cord", "Phrenic Nerve Nucleus")
+    assert graph.contains("Thalamus", "Left Thalamus")
+    assert not graph.contains("Left Thalamus", "Thalamus")
+    assert graph.containers("Lateral Medulla (Brainstem)") == (
+        "Lateral Medulla (Brainstem)", "Medulla (Brainstem)", "Brainstem (General)")
+
+
+def test_supply_is_inherited_and_follows_branches(graph):
+    assert graph.supplying("Left Thalamus") == ("Thalamoperforating arteries", "Posterior Cerebral Artery (PCA)")
+    # PICA branches from the pontine group in the ontology, so its territory counts
+    assert "Lateral Medulla (Brainstem)" in graph.supplied_by("Basilar Artery branches (pontine arteries)")
+
+
+def test_locate_places_free_text(graph):
+    assert graph.locate("left thalamus infarct") == "Left Thalamus"
+    assert graph.locate("Basilar Artery") is None
+
+
+@pytest.mark.parametrize("symptoms, expected", [
+    ([CHOREA], {"Thalamus"}),
+    ([CHOREA, RIGHT_HEMIPARESIS], {"Left Motor Cortex", "Left Thalamus"}),
+    # Weakness on both sides gives no side to resolve against
+    ([CHOREA, RIGHT_HEMIPARESIS, LEFT_HEMIPARESIS], {"Left Motor Cortex", "Right Motor Cortex", "Thalamus"}),
+])
+def test_localize_lateralizes_by_the_hemiparesis_side(localizer, symptoms, expected):
+    assert localizer.localize(symptoms).lesion_locations == expected
@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from localizer.knowledge import DEFAULT_PATH, KnowledgeBaseError, KnowledgeSource, compile_knowledge, validate
+
+
+@pytest.fixture
+def data():
+    with open(DEFAULT_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_shipped_rules_are_valid(data):
+    knowledge = compile_knowledge(data)
+    assert len(knowledge.chains) == len(data["chains"])
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda d: d.update(chains={"a": 1}),
+    lambda d: d.update(chains=[1]),
+    lambda d: d.update(syndromes="x"),
+    lambda d: d.update(nihss_items={"a": 1}),
+    lambda d: d["nihss_items"].append("1a"),
+    lambda d: d["nihss_items"][0].update(scores=3),
+    lambda d: d["chains"][0].update(chain=["x"]),
+    lambda d: d["chains"][0].update(rules={"a": 1}),
+    lambda d: d["chains"][0]["rules"].insert(0, "rule"),
+    lambda d: d["chains"][0]["rules"][0].update(name=["x"]),
+    lambda d: d["chains"][0]["rules"][0].update(when="Vertigo"),
+    lambda d: d["chains"][0]["rules"][0].update(when={"Vertigo": 1}),
+    lambda d: d["chains"][0]["rules"][0].update(lesions=[1]),
+])
+def test_wrong_shapes_are_knowledge_base_errors(data, corrupt):
+    corrupt(data)
+    with pytest.raises(KnowledgeBaseError):
+        validate(data)
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # Make the change visible even within the file system's timestamp resolution
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_bad_reload_keeps_the_previous_rules(tmp_path, data):
+    path = str(tmp_path / "rules.json")
+    _write(path, json.dumps(data))
+    source = KnowledgeSource(path, cache_dir=str(tmp_path / "cache"))
+    good = source.current()
+
+    data["chains"][0]["rules"][0]["when"] = "Vertigo"
+    _write(path, json.dumps(data))
+    assert source.current() is good
+    assert isinstance(source.error, KnowledgeBaseError)
+
+    os.remove(path)
+    assert source.current() is good
+    assert isinstance(source.error, OSError)
+
+
+def test_first_load_still_raises(tmp_path):
+    with pytest.raises(OSError):
+        KnowledgeSource(str(tmp_path / "missing.json")).current()
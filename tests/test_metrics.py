@@ -0,0 +1,23 @@
+from localizer.cache import CachedLocalizer
+from localizer.engine import Localizer
+from localizer.metrics import Metrics
+
+
+def test_every_series_has_help_and_type():
+    metrics = Metrics(enabled=True)
+    localizer = CachedLocalizer(Localizer(metrics=metrics))
+    localizer.localize(["Vertigo"])
+    localizer.localize(["Vertigo"])
+    text = metrics.prometheus(localizer.cache)
+
+    helped, typed, series = set(), set(), set()
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            helped.add(line.split()[2])
+        elif line.startswith("# TYPE "):
+            typed.add(line.split()[2])
+        else:
+            series.add(line.split("{")[0].split()[0])
+    assert series <= helped
+    assert series <= typed
+    assert "localizer_cache_hits_total 1" in text.splitlines()
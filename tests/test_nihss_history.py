@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from localizer.nihss_history import MISSING, NihssHistory, NihssSeries
+
+ITEMS = (("1a. LOC", (0, 1, 2, 3)), ("5a. Motor arm, left", (0, 1, 2, 3, 4)), ("9. Language", (0, 1, 2, 3)))
+LOC, ARM, LANGUAGE = (item for item, _ in ITEMS)
+
+
+@pytest.fixture
+def history():
+    return NihssHistory(ITEMS, max_patients=2)
+
+
+def test_series_keeps_columns_deltas_and_trend(history):
+    history.record("a", {LOC: 1, ARM: 4, LANGUAGE: 2}, when=0.0, label="Baseline")
+    history.record("a", {LOC: 0, ARM: 3}, when=3600.0, label="Post-tPA")
+    series = history.record("a", {LOC: 0, ARM: 1, LANGUAGE: 3}, when=7200.0, label="24 h")
+
+    assert [exam.total for exam in series.exams()] == [7, 3, 4]
+    assert series.exams(1)[0].scores == {LOC: 0, ARM: 3}
+    assert series.matrix()[1].tolist() == [0, 3, MISSING]
+    steps, from_baseline = series.deltas()
+    assert steps.tolist() == [0, -4, 1]
+    assert from_baseline.tolist() == [0, -4, -3]
+    # Language was not scored at the second exam
+    assert series.item_deltas(0, 1).tolist() == [-1, -1, 0]
+
+    trend = series.trend()
+    assert (trend.exams, trend.baseline, trend.latest, trend.change) == (3, 7, 4, -3)
+    assert trend.per_hour == pytest.approx(np.polyfit([0, 1, 2], [7, 3, 4], 1)[0])
+    assert (trend.improved, trend.worsened) == ((LOC, ARM), (LANGUAGE,))
+
+
+def test_empty_series_has_an_empty_trend():
+    series = NihssSeries(ITEMS)
+    assert series.trend() == (0, 0, 0, 0, 0.0, (), ())
+    assert series.deltas()[0].tolist() == []
+    assert series.item_deltas().tolist() == [0, 0, 0]
+
+
+def test_invalid_first_exam_leaves_no_patient_behind(history):
+    history.record("a", {LOC: 1})
+    with pytest.raises(ValueError, match="invalid NIHSS scores for: 1a. LOC"):
+        history.record("b", {LOC: 9})
+    assert "b" not in history
+    with pytest.raises(ValueError):
+        history.record("a", {"unknown": 0})
+    assert len(history.get("a")) == 1
+
+
+def test_least_recently_examined_patients_are_dropped(history):
+    for patient in ("a", "b", "a", "c"):
+        history.record(patient, {LOC: 0})
+    assert history.patients() == ["c", "a"]
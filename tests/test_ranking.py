@@ -0,0 +1,67 @@
+import random
+
+import numpy as np
+import pytest
+
+from localizer.bulk import BulkScorer
+from localizer.engine import Localizer
+from localizer.ranking import Ranker
+from localizer.vocab import SYMPTOMS
+
+
+@pytest.fixture(scope="module")
+def localizer():
+    return Localizer()
+
+
+@pytest.fixture(scope="module")
+def ranker(localizer):
+    return Ranker(localizer)
+
+
+def test_likelihoods_cover_the_result_and_sum_to_one(localizer, ranker):
+    rng = random.Random(0)
+    for _ in range(200):
+        symptoms = rng.sample(SYMPTOMS, rng.randint(1, 6))
+        result = localizer.localize(symptoms)
+        ranking = ranker.rank(result, symptoms)
+        for ranked, names in ((ranking.locations, result.lesion_locations), (ranking.vessels, result.affected_vessels)):
+            assert {name for name, _ in ranked} == names
+            if ranked:
+                assert sum(p for _, p in ranked) == pytest.approx(1.0)
+                assert [p for _, p in ranked] == sorted((p for _, p in ranked), reverse=True)
+
+
+def test_structures_several_rules_agree_on_rank_first(localizer, ranker):
+    # The dysarthria-clumsy hand syndrome adds weight to two of the dysarthria rule's four sites
+    ranking = ranker.rank(localizer.localize(["Dysarthria"]), ["Dysarthria"])
+    assert ranking.locations == (
+        ("Internal Capsule", 0.375), ("Pons (Brainstem)", 0.375), ("Cerebellum", 0.125), ("Motor Cortex", 0.125))
+
+
+def test_lateralized_locations_are_ranked_under_their_shown_names(localizer, ranker):
+    symptoms = ["Right hemiparesis (Upper> Lower)", "Aphasia"]
+    ranking = ranker.rank(localizer.localize(symptoms), symptoms)
+    assert ranking.locations[0][0] == "Left Frontal Lobe"
+    assert all(name.startswith("Left ") for name, _ in ranking.locations)
+
+
+def test_empty_result_has_an_empty_ranking(localizer, ranker):
+    assert ranker.rank(localizer.localize([]), []) == ((), ())
+
+
+def test_batch_ranking_matches_single_cases(localizer, ranker):
+    rng = random.Random(1)
+    cases = [(rng.sample(SYMPTOMS, rng.randint(1, 6)), "") for _ in range(100)]
+    scorer = BulkScorer(localizer)
+    masks = scorer.codec.encode_many(symptoms for symptoms, _ in cases)
+    locations, vessels = ranker.rank_many(masks, scorer.score_masks(masks))
+    catalog = localizer.catalog
+    for i, (symptoms, _) in enumerate(cases):
+        ranking = ranker.rank(localizer.localize(symptoms), symptoms)
+        for ranked, table, row in ((ranking.locations, catalog.locations, locations[i]),
+                                   (ranking.vessels, catalog.vessels, vessels[i])):
+            expected = np.zeros(len(table))
+            for name, p in ranked:
+                expected[table.names.index(name)] = p
+            np.testing.assert_allclose(row, expected)
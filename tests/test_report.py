@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from localizer.engine import Localizer
+from localizer.report import ReportCache, export_report, pdf_available, report_key
+
+SYMPTOMS = ["Vertigo", "Nystagmus"]
+
+
+@pytest.fixture(scope="module")
+def result():
+    return Localizer().localize(SYMPTOMS, "dizzy")
+
+
+def test_key_depends_on_what_the_report_shows(result):
+    key = report_key(SYMPTOMS, "dizzy", result, {"1a. LOC": 1})
+    assert report_key(SYMPTOMS[::-1], " dizzy ", result, {"1a. LOC": 1}) == key
+    assert report_key(SYMPTOMS, "dizzy", result, {"1a. LOC": 2}) != key
+    assert report_key(SYMPTOMS, "dizzy", result, {"1a. LOC": 1}, knowledge_version="2") != key
+
+
+def test_export_renders_once_then_reads_back(tmp_path, result):
+    cache = ReportCache(str(tmp_path))
+    first = export_report(cache, "html", SYMPTOMS, "dizzy", result)
+    assert b"Nystagmus" in first
+    assert export_report(cache, "html", SYMPTOMS, "dizzy", result) == first
+    assert (cache.misses, cache.hits, len(cache)) == (1, 1, 1)
+    # A new cache on the same directory picks the report up
+    assert ReportCache(str(tmp_path)).get(report_key(SYMPTOMS, "dizzy", result), "html") == first
+
+
+def test_least_recently_used_reports_are_removed_past_the_bound(tmp_path):
+    cache = ReportCache(str(tmp_path), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.put(key, "html", b"x" * 100)
+    assert cache.evictions == 1
+    assert sorted(os.listdir(tmp_path)) == ["b.html", "c.html"]
+    # A hit makes "b" the most recent, so "c" goes next
+    cache.get("b", "html")
+    cache.put("d", "html", b"x" * 100)
+    assert sorted(os.listdir(tmp_path)) == ["b.html", "d.html"]
+    assert cache.size == 200
+
+
+def test_a_report_removed_behind_the_cache_is_a_miss(tmp_path):
+    cache = ReportCache(str(tmp_path))
+    cache.put("a", "html", b"report")
+    os.remove(tmp_path / "a.html")
+    assert cache.get("a", "html") is None
+    assert (len(cache), cache.size) == (0, 0)
+
+
+def test_unknown_format_is_rejected(tmp_path, result):
+    with pytest.raises(ValueError, match="unknown report format"):
+        export_report(ReportCache(str(tmp_path)), "docx", SYMPTOMS, "dizzy", result)
+
+
+@pytest.mark.skipif(not pdf_available(), reason="WeasyPrint is not installed")
+def test_pdf_is_printed_from_the_cached_html(tmp_path, result):
+    cache = ReportCache(str(tmp_path))
+    assert export_report(cache, "pdf", SYMPTOMS, "dizzy", result).startswith(b"%PDF")
+    assert len(cache) == 2
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from localizer.engine import Localizer
+from localizer.reverse import EMPTY
+from localizer.vocab import SYMPTOMS
+
+
+@pytest.fixture(scope="module")
+def localizer():
+    return Localizer()
+
+
+def test_every_result_points_back_to_a_selected_symptom(localizer):
+    reverse = localizer.reverse
+    rng = random.Random(0)
+    for _ in range(500):
+        symptoms = set(rng.sample(SYMPTOMS, rng.randint(1, 5)))
+        result = localizer.localize(symptoms)
+        for name in result.lesion_locations:
+            assert not symptoms.isdisjoint(reverse.locations(name).symptoms), name
+        for name in result.affected_vessels:
+            assert not symptoms.isdisjoint(reverse.vessels(name).symptoms), name
+
+
+def test_abbreviations_merge_the_names_that_share_them(localizer):
+    found = localizer.reverse.vessels("pica")
+    assert found.names == ("PICA", "Posterior Inferior Cerebellar Artery (PICA)")
+    assert "vertigo" in [c.rule for c in found.rules]
+    assert [c.rule for c in found.syndromes] == ["wallenberg"]
+
+
+def test_sided_locations_inherit_relative_and_generic_rules(localizer):
+    found = localizer.reverse.locations("Left Thalamus")
+    via = {c.rule: c.via for c in found.rules}
+    assert via["right_hemiparesis_equal"] == ""
+    assert via["hemisensory_loss"] == "Contralateral Thalamus"
+    assert via["hiccup"] == "Thalamus"
+
+
+def test_free_text_names_are_standardized(localizer):
+    assert localizer.reverse.locations("  left internal capsule infarct").names == ("Left Internal Capsule",)
+
+
+def test_unknown_names_find_nothing(localizer):
+    assert localizer.reverse.locations("xyz") is EMPTY
+    assert localizer.reverse.vessels("xyz") is EMPTY
@@ -0,0 +1,40 @@
+import csv
+import glob
+import json
+import os
+
+import pytest
+
+from localizer.review import run_review
+
+
+@pytest.fixture
+def notes(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    lines = [
+        json.dumps({"id": 1, "text": "sudden vertigo and nystagmus"}),
+        '{"id": 2, "text": "truncated',
+        json.dumps(["not", "an", "object"]),
+        json.dumps({"id": 4, "text": 42}),
+        json.dumps({"id": 5, "text": "denies vertigo, has slurred speech"}),
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _rows(out_dir):
+    rows = []
+    for part in sorted(glob.glob(os.path.join(out_dir, "part-*.csv"))):
+        with open(part, newline="", encoding="utf-8") as f:
+            rows += list(csv.DictReader(f))
+    return rows
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_malformed_records_are_skipped_and_counted(notes, tmp_path, capsys, workers):
+    out_dir = str(tmp_path / f"out{workers}")
+    records, done, skipped, malformed = run_review(notes, out_dir, workers=workers, shard_size=64)
+    assert (records, malformed, skipped) == (2, 3, 0)
+    assert [row["id"] for row in _rows(out_dir)] == ["1", "5"]
+    if workers == 0:
+        assert capsys.readouterr().err.count("skipped record at byte") == 3
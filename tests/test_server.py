@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from localizer.server import HttpServer, LocalizerService
+
+
+class _Failing(LocalizerService):
+    async def handle(self, method, path, payload):
+        if path == "/boom":
+            raise KeyError("boom")
+        return await super().handle(method, path, payload)
+
+
+def _post(path, body, connection="keep-alive"):
+    return (f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: {connection}\r\n\r\n"
+            .encode("latin-1") + body)
+
+
+async def _exchange(request, service=None):
+    server = HttpServer(service or LocalizerService())
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+    return response
+
+
+def test_health():
+    response = asyncio.run(_exchange(b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n"))
+    assert response.startswith(b"HTTP/1.1 200 ")
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5", b"+5", b"1_0", b"\xb2"])
+def test_malformed_content_length_is_a_bad_request(length):
+    request = b"POST /localize HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}"
+    response = asyncio.run(_exchange(request))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert b"Content-Length" in response
+
+
+def test_deeply_nested_body_is_a_bad_request():
+    response = asyncio.run(_exchange(_post("/localize", b"[" * 200000, "close")))
+    assert response.startswith(b"HTTP/1.1 400 ")
+
+
+def test_unexpected_error_is_a_500_that_closes_the_connection(caplog):
+    # The request pipelined after the failing one is not answered
+    request = _post("/localize", b'{"symptoms": ["Vertigo"]}') + _post("/boom", b"{}") + _post("/localize", b"{}")
+    response = asyncio.run(_exchange(request, _Failing()))
+    assert response.startswith(b"HTTP/1.1 200 ")
+    assert response.count(b"HTTP/1.1 ") == 2
+    assert b"HTTP/1.1 500 Internal Server Error\r\n" in response
+    assert response.rstrip().endswith(b'{"error": "Internal Server Error"}')
+    assert b"Connection: close" in response
+    assert "unhandled error handling POST /boom" in caplog.text
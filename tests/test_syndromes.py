@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from localizer.knowledge import load_knowledge
+from localizer.syndromes import SyndromeIndex
+from localizer.vocab import SYMPTOMS
+
+ATAXIA = "Ataxia (Limb)"
+CN_III = "Oculomotor palsy (CN III - ptosis, eye down & out)"
+LOWER_FACE = "Facial palsy (Lower face only affected)"
+RIGHT_HEMIPARESIS = "Right hemiparesis (Upper & Lower equally)"
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SyndromeIndex(load_knowledge().syndromes)
+
+
+def _names(rules):
+    return [rule.name for rule in rules]
+
+
+def test_index_matches_a_scan_of_every_syndrome(index):
+    rng = random.Random(0)
+    for _ in range(2000):
+        selected = frozenset(rng.sample(SYMPTOMS, rng.randint(0, 9)))
+        assert index.match(selected) == tuple(rule for rule in index.ranked if rule.matches(selected))
+
+
+def test_every_satisfied_syndrome_applies_most_specific_first(index):
+    # Benedikt needs CN III, limb ataxia and one of its movement disorders; Claude only the first two
+    assert _names(index.match({ATAXIA, CN_III, "Chorea"})) == ["benedikt", "claude"]
+    assert _names(index.match({ATAXIA, CN_III})) == ["claude"]
+
+
+def test_excluded_symptoms_block_a_syndrome(index):
+    assert "left_pure_motor_lacunar" in _names(index.match({LOWER_FACE, RIGHT_HEMIPARESIS}))
+    assert "left_pure_motor_lacunar" not in _names(index.match({LOWER_FACE, RIGHT_HEMIPARESIS, "Aphasia"}))
+
+
+def test_unknown_symptoms_match_nothing(index):
+    assert index.match({"Hiccups after lunch"}) == ()